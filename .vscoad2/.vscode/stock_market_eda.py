@@ -1,378 +1,898 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
 import warnings
-warnings.filterwarnings('ignore')
-
-# Set style for better visualizations
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
-# Load the dataset
-df = pd.read_csv('.vscode/.vscoad2/.vscode/Date,Ticker,Open,High,Low,Close,Vol.csv')
-
-print("="*80)
-print("STOCK MARKET EXPLORATORY DATA ANALYSIS")
-print("="*80)
-
-# ============================================================================
-# 1. DATA OVERVIEW & QUALITY ASSESSMENT
-# ============================================================================
-print("\n" + "="*80)
-print("1. DATA OVERVIEW & QUALITY ASSESSMENT")
-print("="*80)
-
-print("\nDataset Shape:")
-print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
-
-print("\nColumn Names and Data Types:")
-print(df.dtypes)
-
-print("\nFirst 5 Rows:")
-print(df.head())
-
-print("\nLast 5 Rows:")
-print(df.tail())
-
-print("\nMissing Values:")
-print(df.isnull().sum())
-
-print("\nDuplicate Rows:")
-print(f"Number of duplicates: {df.duplicated().sum()}")
-
-print("\nBasic Statistical Summary:")
-print(df.describe())
-
-print("\nUnique Values:")
-print(f"Unique Tickers: {df['Ticker'].nunique()}")
-print(f"Tickers: {df['Ticker'].unique()}")
-print(f"Unique Sectors: {df['Sector'].nunique()}")
-print(f"Sectors: {df['Sector'].unique()}")
-print(f"Date Range: {df['Date'].min()} to {df['Date'].max()}")
-
-# ============================================================================
-# 2. DATA PREPARATION
-# ============================================================================
-print("\n" + "="*80)
-print("2. DATA PREPARATION")
-print("="*80)
-
-# Convert Date to datetime
-df['Date'] = pd.to_datetime(df['Date'])
-df = df.sort_values(['Ticker', 'Date'])
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 
-# Calculate Daily Returns
-df['Daily_Return'] = df.groupby('Ticker')['Close'].pct_change() * 100
-
-# Calculate Price Range
-df['Price_Range'] = df['High'] - df['Low']
-
-# Calculate Price Change
-df['Price_Change'] = df['Close'] - df['Open']
-
-print("\nNew Features Created:")
-print("- Daily_Return: Percentage change in closing price")
-print("- Price_Range: Difference between High and Low")
-print("- Price_Change: Difference between Close and Open")
-
-print("\nUpdated Dataset Info:")
-print(df.info())
-
-# ============================================================================
-# 3. PRICE ANALYSIS
-# ============================================================================
-print("\n" + "="*80)
-print("3. PRICE ANALYSIS")
-print("="*80)
-
-# Overall statistics by ticker
-price_stats = df.groupby('Ticker').agg({
-    'Close': ['mean', 'min', 'max', 'std'],
-    'Daily_Return': ['mean', 'std'],
-    'Volume': 'mean'
-}).round(2)
-
-print("\nPrice Statistics by Ticker:")
-print(price_stats)
-
-# Performance from start to end
-performance = df.groupby('Ticker').agg({
-    'Close': ['first', 'last']
-}).round(2)
-performance.columns = ['Start_Price', 'End_Price']
-performance['Change_$'] = (performance['End_Price'] - performance['Start_Price']).round(2)
-performance['Change_%'] = ((performance['End_Price'] - performance['Start_Price']) / performance['Start_Price'] * 100).round(2)
-performance = performance.sort_values('Change_%', ascending=False)
-
-print("\nStock Performance (Period Return):")
-print(performance)
+import numpy as np
+import pandas as pd
 
-# ============================================================================
-# 4. VOLATILITY ANALYSIS
-# ============================================================================
-print("\n" + "="*80)
-print("4. VOLATILITY ANALYSIS")
-print("="*80)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from instrumentation import count, stage, timed  # noqa: E402
+from data_loader import FILTER_OPS, format_memory_report, load_compact_csv, read_csv_cached  # noqa: E402
+from lod import plot_lod  # noqa: E402
+
+DATA_PATH = '.vscode/.vscoad2/.vscode/Date,Ticker,Open,High,Low,Close,Vol.csv'
+
+
+def _section(title):
+    print("\n" + "="*80)
+    print(title)
+    print("="*80)
+
+
+def price_filters(tickers=None, start=None, end=None) -> List:
+    filters = []
+    if tickers:
+        filters.append(('Ticker', 'in', list(tickers)))
+    if start:
+        filters.append(('Date', '>=', pd.Timestamp(start)))
+    if end:
+        filters.append(('Date', '<=', pd.Timestamp(end)))
+    return filters
+
+
+def load_prices(path=DATA_PATH, compact=True, report: Dict = None, cache=True,
+                tickers=None, start=None, end=None) -> pd.DataFrame:
+    """
+    read the price csv; compact keeps Ticker and Sector as categories and
+    prices as float32 (see data_loader) and fills report with the memory saved
+    cache reads a compact load through the columnar csv cache, sorted by
+    ticker and date so tickers/start/end only read the row groups they need
+    """
+    filters = price_filters(tickers, start, end)
+    with stage("stock.csv_load") as s:
+        if compact and cache:
+            df = read_csv_cached(path, filters=filters, parse_dates=['Date'], compact=True,
+                                 categorical=['Ticker', 'Sector'], sort_by=['Ticker', 'Date'], report=report)
+            filters = []
+        elif compact:
+            df, memory = load_compact_csv(path, categorical=['Ticker', 'Sector'], parse_dates=['Date'])
+            if report is not None:
+                report.update(memory)
+        else:
+            df = pd.read_csv(path, parse_dates=['Date'] if filters else None)
+        for column, op, value in filters:
+            df = df[df[column].isin(value) if op == 'in' else FILTER_OPS[op](df[column], value)]
+        s.rows = len(df)
+    return df
+
+
+def print_overview(df, memory: Dict = None):
+    """
+    1. data overview & quality assessment
+    """
+    _section("1. DATA OVERVIEW & QUALITY ASSESSMENT")
+
+    print("\nDataset Shape:")
+    print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
+    if memory:
+        print(format_memory_report(memory))
+
+    print("\nColumn Names and Data Types:")
+    print(df.dtypes)
+
+    print("\nFirst 5 Rows:")
+    print(df.head())
+
+    print("\nLast 5 Rows:")
+    print(df.tail())
+
+    print("\nMissing Values:")
+    print(df.isnull().sum())
+
+    print("\nDuplicate Rows:")
+    print(f"Number of duplicates: {df.duplicated().sum()}")
+
+    print("\nBasic Statistical Summary:")
+    print(df.describe())
+
+    print("\nUnique Values:")
+    print(f"Unique Tickers: {df['Ticker'].nunique()}")
+    print(f"Tickers: {df['Ticker'].unique()}")
+    print(f"Unique Sectors: {df['Sector'].nunique()}")
+    print(f"Sectors: {df['Sector'].unique()}")
+    print(f"Date Range: {df['Date'].min()} to {df['Date'].max()}")
+
+
+@timed("stock.prepare", count="arg")
+def prepare(df) -> pd.DataFrame:
+    """
+    2. data preparation: parse dates, sort and add the derived columns
+    """
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values(['Ticker', 'Date'])
+
+    # Calculate Daily Returns
+    df['Daily_Return'] = df.groupby('Ticker')['Close'].pct_change() * 100
+
+    # Calculate Price Range
+    df['Price_Range'] = df['High'] - df['Low']
+
+    # Calculate Price Change
+    df['Price_Change'] = df['Close'] - df['Open']
+    return df
+
+
+@timed("stock.groupby", count="arg")
+def price_stats(df) -> pd.DataFrame:
+    return df.groupby('Ticker').agg({
+        'Close': ['mean', 'min', 'max', 'std'],
+        'Daily_Return': ['mean', 'std'],
+        'Volume': 'mean'
+    }).round(2)
+
+
+@timed("stock.groupby", count="arg")
+def performance(df) -> pd.DataFrame:
+    """
+    performance from start to end of the period, best first
+    """
+    perf = df.groupby('Ticker').agg({
+        'Close': ['first', 'last']
+    }).round(2)
+    perf.columns = ['Start_Price', 'End_Price']
+    perf['Change_$'] = (perf['End_Price'] - perf['Start_Price']).round(2)
+    perf['Change_%'] = ((perf['End_Price'] - perf['Start_Price']) / perf['Start_Price'] * 100).round(2)
+    return perf.sort_values('Change_%', ascending=False)
+
+
+@timed("stock.groupby", count="arg")
+def volatility(df) -> pd.Series:
+    return df.groupby('Ticker')['Daily_Return'].std().sort_values(ascending=False)
+
+
+@timed("stock.groupby", count="arg")
+def volume_stats(df) -> pd.DataFrame:
+    return df.groupby('Ticker')['Volume'].agg(['mean', 'min', 'max']).sort_values('mean', ascending=False)
+
+
+@timed("stock.groupby", count="arg")
+def sector_performance(df) -> pd.DataFrame:
+    return df.groupby('Sector').agg({
+        'Close': 'mean',
+        'Volume': 'mean',
+        'Daily_Return': 'mean'
+    }).sort_values('Daily_Return', ascending=False)
 
-volatility = df.groupby('Ticker')['Daily_Return'].std().sort_values(ascending=False)
-print("\nVolatility (Std Dev of Daily Returns):")
-print(volatility)
 
-print(f"\nMost Volatile Stock: {volatility.idxmax()} ({volatility.max():.2f}%)")
-print(f"Least Volatile Stock: {volatility.idxmin()} ({volatility.min():.2f}%)")
+@timed("stock.correlation", count="arg")
+def correlation(df) -> pd.DataFrame:
+    price_pivot = df.pivot_table(values='Close', index='Date', columns='Ticker')
+    return price_pivot.corr()
 
-# ============================================================================
-# 5. VOLUME ANALYSIS
-# ============================================================================
-print("\n" + "="*80)
-print("5. VOLUME ANALYSIS")
-print("="*80)
 
-volume_stats = df.groupby('Ticker')['Volume'].agg(['mean', 'min', 'max']).sort_values('mean', ascending=False)
-print("\nTrading Volume Statistics:")
-print(volume_stats)
+def analyze(df) -> Dict[str, pd.DataFrame]:
+    """
+    every aggregate the report and the charts use, from a prepared frame
+    """
+    return {
+        "price_stats": price_stats(df),
+        "performance": performance(df),
+        "volatility": volatility(df),
+        "volume_stats": volume_stats(df),
+        "sector_performance": sector_performance(df),
+        "correlation": correlation(df),
+    }
 
-# ============================================================================
-# 6. SECTOR ANALYSIS
-# ============================================================================
-print("\n" + "="*80)
-print("6. SECTOR ANALYSIS")
-print("="*80)
 
-sector_performance = df.groupby('Sector').agg({
-    'Close': 'mean',
-    'Volume': 'mean',
-    'Daily_Return': 'mean'
-}).sort_values('Daily_Return', ascending=False)
+def print_analysis(df, results):
+    """
+    sections 2 to 7 of the report
+    """
+    _section("2. DATA PREPARATION")
+    print("\nNew Features Created:")
+    print("- Daily_Return: Percentage change in closing price")
+    print("- Price_Range: Difference between High and Low")
+    print("- Price_Change: Difference between Close and Open")
+
+    print("\nUpdated Dataset Info:")
+    print(df.info())
+    print_tables(results)
+
+
+def print_tables(results):
+    """
+    sections 3 to 7 of the report
+    """
+    _section("3. PRICE ANALYSIS")
+    print("\nPrice Statistics by Ticker:")
+    print(results["price_stats"])
+
+    print("\nStock Performance (Period Return):")
+    print(results["performance"])
+
+    _section("4. VOLATILITY ANALYSIS")
+    vol = results["volatility"]
+    print("\nVolatility (Std Dev of Daily Returns):")
+    print(vol)
+
+    print(f"\nMost Volatile Stock: {vol.idxmax()} ({vol.max():.2f}%)")
+    print(f"Least Volatile Stock: {vol.idxmin()} ({vol.min():.2f}%)")
+
+    _section("5. VOLUME ANALYSIS")
+    print("\nTrading Volume Statistics:")
+    print(results["volume_stats"])
+
+    _section("6. SECTOR ANALYSIS")
+    print("\nAverage Performance by Sector:")
+    print(results["sector_performance"])
+
+    _section("7. CORRELATION ANALYSIS")
+    print("\nCorrelation Matrix (Stock Prices):")
+    print(results["correlation"].round(2))
 
-print("\nAverage Performance by Sector:")
-print(sector_performance)
 
 # ============================================================================
-# 7. CORRELATION ANALYSIS
+# INCREMENTAL REFRESH
 # ============================================================================
-print("\n" + "="*80)
-print("7. CORRELATION ANALYSIS")
-print("="*80)
 
-# Create pivot table for correlation
-price_pivot = df.pivot_table(values='Close', index='Date', columns='Ticker')
-correlation_matrix = price_pivot.corr()
+def _merge_moments(n, mean, m2, batch_n, batch_mean, batch_m2):
+    """
+    combine running (count, mean, sum of squared deviations) with a batch's
+    """
+    total = n + batch_n
+    safe = np.where(total > 0, total, 1)
+    delta = batch_mean - mean
+    new_mean = np.where(batch_n > 0, mean + delta * batch_n / safe, mean)
+    new_m2 = np.where(batch_n > 0, m2 + batch_m2 + delta**2 * n * batch_n / safe, m2)
+    return total, new_mean, new_m2
+
+
+def _batch_moments(ids, values, size):
+    """
+    per-id count, mean and squared-deviation sum of values, skipping nan
+    """
+    valid = ~np.isnan(values)
+    ids, values = ids[valid], values[valid]
+    n = np.bincount(ids, minlength=size).astype(np.float64)
+    mean = np.bincount(ids, values, minlength=size) / np.where(n > 0, n, 1)
+    m2 = np.bincount(ids, (values - mean[ids])**2, minlength=size)
+    return n, mean, m2
+
+
+class TickerState:
+    # per-ticker running aggregates; close_shift (the first close) keeps the
+    # correlation co-moments well conditioned. last_close is the last non-nan
+    # close, prev_close the close of the last row applied (nan included) so
+    # returns chain the way pct_change does
+    FLOAT_FIELDS = ["first_close", "last_close", "prev_close", "close_shift",
+                    "close_n", "close_mean", "close_m2", "close_min", "close_max",
+                    "return_n", "return_mean", "return_m2", "rows",
+                    "volume_n", "volume_sum", "volume_min", "volume_max", "range_n", "range_sum"]
+    # fields missing from states saved before they existed, and the field
+    # each is rebuilt from
+    LEGACY_FIELDS = {"prev_close": "last_close", "volume_n": "rows", "range_n": "rows"}
+    PAIR_FIELDS = ["pair_n", "pair_sum", "pair_sq", "pair_prod"]
+
+    def __init__(self):
+        """
+        persisted per-ticker state for the daily refresh
+        holds last close and date, first price, running close and return
+        moments, volume sums and extremes, and pairwise close co-moments, so a
+        new day of rows updates every table without re-reading the history.
+        rows must arrive in date order per ticker; rows dated on or before a
+        ticker's last seen date are skipped, so re-applying a file is harmless.
+        the pairwise sums assume all of a date's rows arrive in one update
+        """
+        self.tickers: List[str] = []
+        self.sectors: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.last_date = np.empty(0, dtype=np.int64)
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.empty(0))
+        for field in self.PAIR_FIELDS:
+            setattr(self, field, np.empty((0, 0)))
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.rows.sum())
+
+    def _grow(self, tickers, sectors):
+        for ticker, sector in zip(tickers, sectors):
+            self.index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+            self.sectors.append(sector)
+        k, add = len(self.tickers), len(tickers)
+        self.last_date = np.r_[self.last_date, np.full(add, np.iinfo(np.int64).min)]
+        for field in self.FLOAT_FIELDS:
+            fill = {"close_min": np.inf, "volume_min": np.inf, "close_max": -np.inf,
+                    "volume_max": -np.inf, "first_close": np.nan, "last_close": np.nan,
+                    "prev_close": np.nan, "close_shift": np.nan}.get(field, 0.0)
+            setattr(self, field, np.r_[getattr(self, field), np.full(add, fill)])
+        for field in self.PAIR_FIELDS:
+            grown = np.zeros((k, k))
+            old = getattr(self, field)
+            grown[:len(old), :len(old)] = old
+            setattr(self, field, grown)
+
+    @timed("stock.refresh", count="arg")
+    def update(self, rows) -> int:
+        """
+        fold new price rows into the state; returns how many were applied
+        """
+        new = rows.drop_duplicates('Ticker')
+        new = new[~new['Ticker'].isin(self.index)]
+        if len(new):
+            self._grow(new['Ticker'].tolist(), new['Sector'].tolist())
+
+        k = len(self.tickers)
+        ids = rows['Ticker'].map(self.index).to_numpy(dtype=np.intp)
+        dates = pd.to_datetime(rows['Date']).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        fresh = dates > self.last_date[ids]
+        order = np.lexsort((dates[fresh], ids[fresh]))
+        ids, dates = ids[fresh][order], dates[fresh][order]
+        if not len(ids):
+            return 0
+        take = np.flatnonzero(fresh)[order]
+        column = lambda name: rows[name].to_numpy(dtype=np.float64)[take]
+        close, volume = column('Close'), column('Volume')
+        price_range = column('High') - column('Low')
+
+        starts = np.r_[True, ids[1:] != ids[:-1]]
+        ends = np.r_[ids[1:] != ids[:-1], True]
+        # first and last non-nan close of each ticker in the batch; ids are
+        # sorted, so the first write per ticker wins when assigning reversed
+        ok = ~np.isnan(close)
+        first_ok = np.flatnonzero(ok)[::-1]
+        batch_first = np.full(k, np.nan)
+        batch_first[ids[first_ok]] = close[first_ok]
+        batch_last = np.full(k, np.nan)
+        batch_last[ids[ok]] = close[ok]
+        unseen = np.isnan(self.first_close) & ~np.isnan(batch_first)
+        self.first_close[unseen] = batch_first[unseen]
+        self.close_shift[unseen] = batch_first[unseen]
+
+        # daily returns chain from the last applied close of each ticker
+        previous = np.r_[np.nan, close[:-1]]
+        previous[starts] = self.prev_close[ids[starts]]
+        daily_return = (close / previous - 1) * 100
+
+        self.close_n, self.close_mean, self.close_m2 = _merge_moments(
+            self.close_n, self.close_mean, self.close_m2, *_batch_moments(ids, close, k))
+        self.return_n, self.return_mean, self.return_m2 = _merge_moments(
+            self.return_n, self.return_mean, self.return_m2, *_batch_moments(ids, daily_return, k))
+        np.fmin.at(self.close_min, ids, close)
+        np.fmax.at(self.close_max, ids, close)
+        np.fmin.at(self.volume_min, ids, volume)
+        np.fmax.at(self.volume_max, ids, volume)
+        self.rows += np.bincount(ids, minlength=k)
+        self.volume_n += np.bincount(ids, ~np.isnan(volume), minlength=k)
+        self.volume_sum += np.bincount(ids, np.nan_to_num(volume), minlength=k)
+        self.range_n += np.bincount(ids, ~np.isnan(price_range), minlength=k)
+        self.range_sum += np.bincount(ids, np.nan_to_num(price_range), minlength=k)
+        seen = ~np.isnan(batch_last)
+        self.last_close[seen] = batch_last[seen]
+        self.prev_close[ids[ends]] = close[ends]
+        self.last_date[ids[ends]] = dates[ends]
+
+        # pairwise co-moments over the dates both tickers have a close
+        day_codes, day = np.unique(dates, return_inverse=True)
+        shifted = np.zeros((len(day_codes), k))
+        present = np.zeros((len(day_codes), k))
+        shifted[day[ok], ids[ok]] = close[ok] - self.close_shift[ids[ok]]
+        present[day[ok], ids[ok]] = 1.0
+        self.pair_n += present.T @ present
+        self.pair_sum += shifted.T @ present
+        self.pair_sq += (shifted * shifted).T @ present
+        self.pair_prod += shifted.T @ shifted
+        return len(ids)
+
+    def results(self) -> Dict[str, pd.DataFrame]:
+        """
+        the same tables analyze() builds from a full frame
+        """
+        index = pd.Index(self.tickers, name='Ticker')
+        sample = lambda n, m2: np.where(n > 1, m2 / np.where(n > 1, n - 1, 1), np.nan)
+        close_std = np.sqrt(sample(self.close_n, self.close_m2))
+        return_std = np.sqrt(sample(self.return_n, self.return_m2))
+        return_mean = np.where(self.return_n > 0, self.return_mean, np.nan)
+        volume_mean = self.volume_sum / np.where(self.volume_n > 0, self.volume_n, np.nan)
+
+        price = pd.DataFrame({
+            ('Close', 'mean'): self.close_mean, ('Close', 'min'): self.close_min,
+            ('Close', 'max'): self.close_max, ('Close', 'std'): close_std,
+            ('Daily_Return', 'mean'): return_mean, ('Daily_Return', 'std'): return_std,
+            ('Volume', 'mean'): volume_mean,
+        }, index=index).sort_index().round(2)
+
+        perf = pd.DataFrame({'Start_Price': self.first_close, 'End_Price': self.last_close},
+                            index=index).sort_index().round(2)
+        perf['Change_$'] = (perf['End_Price'] - perf['Start_Price']).round(2)
+        perf['Change_%'] = ((perf['End_Price'] - perf['Start_Price']) / perf['Start_Price'] * 100).round(2)
+
+        volume = pd.DataFrame({'mean': volume_mean, 'min': self.volume_min, 'max': self.volume_max},
+                              index=index).sort_index()
+
+        by_sector = pd.DataFrame({
+            'Sector': self.sectors,
+            'close_sum': self.close_mean * self.close_n, 'close_n': self.close_n,
+            'volume_sum': self.volume_sum, 'volume_n': self.volume_n,
+            'return_sum': self.return_mean * self.return_n, 'return_n': self.return_n,
+        }).groupby('Sector').sum()
+        sector = pd.DataFrame({
+            'Close': by_sector['close_sum'] / by_sector['close_n'],
+            'Volume': by_sector['volume_sum'] / by_sector['volume_n'],
+            'Daily_Return': by_sector['return_sum'] / by_sector['return_n'],
+        })
 
-print("\nCorrelation Matrix (Stock Prices):")
-print(correlation_matrix.round(2))
+        n, s, q, p = self.pair_n, self.pair_sum, self.pair_sq, self.pair_prod
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * p - s * s.T
+            corr = cov / np.sqrt((n * q - s * s) * (n * q.T - s.T * s.T))
+        corr[n < 2] = np.nan
+        columns = pd.Index(self.tickers, name='Ticker')
+        corr = pd.DataFrame(corr, index=columns, columns=columns).sort_index().sort_index(axis=1)
+
+        return {
+            "price_stats": price,
+            "performance": perf.sort_values('Change_%', ascending=False),
+            "volatility": pd.Series(return_std, index=index, name='Daily_Return').sort_values(ascending=False),
+            "volume_stats": volume.sort_values('mean', ascending=False),
+            "sector_performance": sector.sort_values('Daily_Return', ascending=False),
+            "correlation": corr,
+        }
+
+    def chart_inputs(self, results) -> Dict[str, object]:
+        """
+        inputs of the charts that only need aggregates; the price trend and
+        return distribution charts need the full history and are left out
+        """
+        range_avg = pd.Series(self.range_sum / np.where(self.range_n > 0, self.range_n, np.nan),
+                              index=pd.Index(self.tickers, name='Ticker'), name='Price_Range')
+        return {
+            "02_trading_volume.png": results["volume_stats"]['mean'].rename('Volume'),
+            "03_stock_performance.png": results["performance"]['Change_%'],
+            "04_volatility.png": results["volatility"].sort_values(ascending=True),
+            "05_correlation_heatmap.png": results["correlation"],
+            "07_sector_performance.png": results["sector_performance"]['Daily_Return'].sort_values(),
+            "08_price_range.png": range_avg.sort_index().sort_values(ascending=False),
+        }
+
+    def save(self, path):
+        """
+        write the state to an .npz file, replacing the old one atomically
+        """
+        arrays = {field: getattr(self, field) for field in self.FLOAT_FIELDS + self.PAIR_FIELDS}
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as file:
+            np.savez(file, tickers=np.array(self.tickers, dtype=str), sectors=np.array(self.sectors, dtype=str),
+                     last_date=self.last_date, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "TickerState":
+        state = cls()
+        with np.load(path) as data:
+            state.tickers = data['tickers'].tolist()
+            state.sectors = data['sectors'].tolist()
+            state.index = {ticker: i for i, ticker in enumerate(state.tickers)}
+            state.last_date = data['last_date']
+            for field in cls.FLOAT_FIELDS + cls.PAIR_FIELDS:
+                stored = field if field in data else cls.LEGACY_FIELDS[field]
+                setattr(state, field, data[stored])
+        return state
+
+    @classmethod
+    def load_or_create(cls, path) -> "TickerState":
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+def refresh(state_path, rows_path, out_dir='.', preview=False, workers=None, force=False, charts=True):
+    """
+    apply a file of new price rows to the saved state and report from it
+    the first run (no state yet) builds the state from a full history file
+    """
+    state = TickerState.load_or_create(state_path)
+    applied = state.update(load_prices(rows_path, cache=False))
+    state.save(state_path)
+
+    print("="*80)
+    print("STOCK MARKET DAILY REFRESH")
+    print("="*80)
+    print(f"\nApplied {applied} new rows; state covers {len(state)} tickers and {state.n_rows} rows.")
+
+    results = state.results()
+    print_tables(results)
+    if charts:
+        save_charts(state.chart_inputs(results), out_dir, preview, workers, force)
+    print_insights(results)
+    return results
 
-# ============================================================================
-# 8. VISUALIZATIONS (Separate Clear Charts)
-# ============================================================================
-print("\n" + "="*80)
-print("8. GENERATING VISUALIZATIONS")
-print("="*80)
-
-# Visualization 1: Price Trends Over Time
-print("\nGenerating Chart 1: Price Trends Over Time...")
-plt.figure(figsize=(14, 7))
-for ticker in df['Ticker'].unique():
-    ticker_data = df[df['Ticker'] == ticker]
-    plt.plot(ticker_data['Date'], ticker_data['Close'], label=ticker, linewidth=2.5, marker='o', markersize=4)
-plt.title('Stock Price Trends Over Time', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Date', fontsize=12, fontweight='bold')
-plt.ylabel('Closing Price ($)', fontsize=12, fontweight='bold')
-plt.legend(fontsize=10, loc='best', frameon=True, shadow=True)
-plt.grid(True, alpha=0.3, linestyle='--')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('01_price_trends.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '01_price_trends.png'")
-plt.close()
-
-# Visualization 2: Trading Volume by Stock
-print("Generating Chart 2: Trading Volume by Stock...")
-plt.figure(figsize=(12, 7))
-avg_volume = df.groupby('Ticker')['Volume'].mean().sort_values(ascending=False)
-colors = plt.cm.viridis(np.linspace(0, 1, len(avg_volume)))
-bars = plt.bar(avg_volume.index, avg_volume.values, color=colors, edgecolor='black', linewidth=1.5)
-plt.title('Average Trading Volume by Stock', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Ticker', fontsize=12, fontweight='bold')
-plt.ylabel('Average Volume (Millions)', fontsize=12, fontweight='bold')
-plt.xticks(rotation=45, fontsize=11)
-plt.grid(axis='y', alpha=0.3, linestyle='--')
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height,
-             f'{int(height/1e6)}M', ha='center', va='bottom', fontsize=10, fontweight='bold')
-plt.tight_layout()
-plt.savefig('02_trading_volume.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '02_trading_volume.png'")
-plt.close()
-
-# Visualization 3: Stock Performance (% Change)
-print("Generating Chart 3: Stock Performance...")
-plt.figure(figsize=(12, 7))
-colors = ['#2ecc71' if x > 0 else '#e74c3c' for x in performance['Change_%']]
-bars = plt.barh(performance.index, performance['Change_%'], color=colors, edgecolor='black', linewidth=1.5)
-plt.title('Stock Performance - Percentage Change', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Percentage Change (%)', fontsize=12, fontweight='bold')
-plt.ylabel('Ticker', fontsize=12, fontweight='bold')
-plt.axvline(x=0, color='black', linestyle='-', linewidth=1)
-plt.grid(axis='x', alpha=0.3, linestyle='--')
-for i, bar in enumerate(bars):
-    width = bar.get_width()
-    plt.text(width, bar.get_y() + bar.get_height()/2.,
-             f' {width:.2f}%', ha='left' if width > 0 else 'right', 
-             va='center', fontsize=11, fontweight='bold')
-plt.tight_layout()
-plt.savefig('03_stock_performance.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '03_stock_performance.png'")
-plt.close()
-
-# Visualization 4: Volatility Comparison
-print("Generating Chart 4: Volatility Comparison...")
-plt.figure(figsize=(12, 7))
-volatility_sorted = volatility.sort_values(ascending=True)
-colors = plt.cm.Oranges(np.linspace(0.4, 0.9, len(volatility_sorted)))
-bars = plt.barh(volatility_sorted.index, volatility_sorted.values, color=colors, edgecolor='black', linewidth=1.5)
-plt.title('Stock Volatility - Standard Deviation of Returns', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Standard Deviation (%)', fontsize=12, fontweight='bold')
-plt.ylabel('Ticker', fontsize=12, fontweight='bold')
-plt.grid(axis='x', alpha=0.3, linestyle='--')
-for i, bar in enumerate(bars):
-    width = bar.get_width()
-    plt.text(width, bar.get_y() + bar.get_height()/2.,
-             f' {width:.2f}%', ha='left', va='center', fontsize=11, fontweight='bold')
-plt.tight_layout()
-plt.savefig('04_volatility.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '04_volatility.png'")
-plt.close()
-
-# Visualization 5: Correlation Heatmap
-print("Generating Chart 5: Correlation Heatmap...")
-plt.figure(figsize=(12, 10))
-sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm', 
-            square=True, linewidths=2, cbar_kws={"shrink": 0.8},
-            annot_kws={'fontsize': 11, 'fontweight': 'bold'},
-            vmin=-1, vmax=1, center=0)
-plt.title('Stock Price Correlation Matrix', fontsize=18, fontweight='bold', pad=20)
-plt.xticks(rotation=45, ha='right', fontsize=11)
-plt.yticks(rotation=0, fontsize=11)
-plt.tight_layout()
-plt.savefig('05_correlation_heatmap.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '05_correlation_heatmap.png'")
-plt.close()
-
-# Visualization 6: Distribution of Daily Returns (Box Plot)
-print("Generating Chart 6: Distribution of Daily Returns...")
-plt.figure(figsize=(14, 7))
-df_clean = df.dropna(subset=['Daily_Return'])
-box_data = [df_clean[df_clean['Ticker'] == ticker]['Daily_Return'].values 
-            for ticker in df['Ticker'].unique()]
-bp = plt.boxplot(box_data, labels=df['Ticker'].unique(), patch_artist=True,
-                 notch=True, showmeans=True)
-colors = plt.cm.Set3(np.linspace(0, 1, len(bp['boxes'])))
-for patch, color in zip(bp['boxes'], colors):
-    patch.set_facecolor(color)
-    patch.set_edgecolor('black')
-    patch.set_linewidth(1.5)
-plt.title('Distribution of Daily Returns by Stock', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Ticker', fontsize=12, fontweight='bold')
-plt.ylabel('Daily Return (%)', fontsize=12, fontweight='bold')
-plt.axhline(y=0, color='red', linestyle='--', linewidth=1.5, alpha=0.5)
-plt.grid(axis='y', alpha=0.3, linestyle='--')
-plt.xticks(rotation=45, fontsize=11)
-plt.tight_layout()
-plt.savefig('06_returns_distribution.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '06_returns_distribution.png'")
-plt.close()
-
-# Visualization 7: Sector Performance
-print("Generating Chart 7: Sector Performance...")
-plt.figure(figsize=(12, 7))
-sector_avg = df.groupby('Sector')['Daily_Return'].mean().sort_values()
-colors_sector = ['#2ecc71' if x > 0 else '#e74c3c' for x in sector_avg]
-bars = plt.barh(sector_avg.index, sector_avg.values, color=colors_sector, 
-                edgecolor='black', linewidth=1.5)
-plt.title('Average Daily Return by Sector', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Average Daily Return (%)', fontsize=12, fontweight='bold')
-plt.ylabel('Sector', fontsize=12, fontweight='bold')
-plt.axvline(x=0, color='black', linestyle='-', linewidth=1)
-plt.grid(axis='x', alpha=0.3, linestyle='--')
-for i, bar in enumerate(bars):
-    width = bar.get_width()
-    plt.text(width, bar.get_y() + bar.get_height()/2.,
-             f' {width:.3f}%', ha='left' if width > 0 else 'right', 
-             va='center', fontsize=11, fontweight='bold')
-plt.tight_layout()
-plt.savefig('07_sector_performance.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '07_sector_performance.png'")
-plt.close()
-
-# Visualization 8: Price Range Analysis
-print("Generating Chart 8: Price Range Analysis...")
-plt.figure(figsize=(12, 7))
-price_range_avg = df.groupby('Ticker')['Price_Range'].mean().sort_values(ascending=False)
-colors = plt.cm.Purples(np.linspace(0.4, 0.9, len(price_range_avg)))
-bars = plt.bar(price_range_avg.index, price_range_avg.values, color=colors, 
-               edgecolor='black', linewidth=1.5)
-plt.title('Average Daily Price Range by Stock', fontsize=18, fontweight='bold', pad=20)
-plt.xlabel('Ticker', fontsize=12, fontweight='bold')
-plt.ylabel('Average Price Range ($)', fontsize=12, fontweight='bold')
-plt.xticks(rotation=45, fontsize=11)
-plt.grid(axis='y', alpha=0.3, linestyle='--')
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height,
-             f'${height:.2f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-plt.tight_layout()
-plt.savefig('08_price_range.png', dpi=300, bbox_inches='tight')
-print("✓ Saved as '08_price_range.png'")
-plt.close()
-
-print("\n✓ All 8 visualizations saved as separate PNG files!")
-print("  Files: 01_price_trends.png to 08_price_range.png")
 
 # ============================================================================
-# 9. KEY INSIGHTS & FINDINGS
+# VISUALIZATIONS (Separate Clear Charts)
+# each chart is drawn from a small input (chart_inputs) onto its own Agg
+# Figure, so charts render in worker processes without pyplot state, and a
+# chart whose input and drawing code are unchanged since the last run is
+# skipped. matplotlib and seaborn are only imported in the renderer.
 # ============================================================================
-print("\n" + "="*80)
-print("9. KEY INSIGHTS & FINDINGS")
-print("="*80)
-
-print("\n📈 BEST PERFORMERS:")
-top_performers = performance.nlargest(3, 'Change_%')
-for idx, row in top_performers.iterrows():
-    print(f"   {idx}: +{row['Change_%']:.2f}% (${row['Start_Price']:.2f} → ${row['End_Price']:.2f})")
-
-print("\n📉 WORST PERFORMERS:")
-worst_performers = performance.nsmallest(3, 'Change_%')
-for idx, row in worst_performers.iterrows():
-    print(f"   {idx}: {row['Change_%']:.2f}% (${row['Start_Price']:.2f} → ${row['End_Price']:.2f})")
-
-print("\n⚡ MOST VOLATILE STOCKS:")
-for ticker in volatility.nlargest(3).index:
-    print(f"   {ticker}: {volatility[ticker]:.2f}% std dev")
-
-print("\n🔄 HIGHEST TRADING VOLUME:")
-for ticker in volume_stats.nlargest(3, 'mean').index:
-    print(f"   {ticker}: {volume_stats.loc[ticker, 'mean']:,.0f} shares avg")
-
-print("\n🔗 HIGHLY CORRELATED PAIRS:")
-corr_pairs = []
-for i in range(len(correlation_matrix.columns)):
-    for j in range(i+1, len(correlation_matrix.columns)):
-        corr_pairs.append({
-            'Stock1': correlation_matrix.columns[i],
-            'Stock2': correlation_matrix.columns[j],
-            'Correlation': correlation_matrix.iloc[i, j]
-        })
-corr_df = pd.DataFrame(corr_pairs).sort_values('Correlation', ascending=False)
-print(corr_df.head(3).to_string(index=False))
-
-print("\n" + "="*80)
-print("EDA COMPLETE! 🎉")
-print("="*80)
-print("\nAll visualizations have been generated and saved.")
-print("Check 'stock_market_eda.png' for comprehensive visual analysis.")
 
-plt.show()
\ No newline at end of file
+CHART_DPI = 300
+PREVIEW_DPI = 72
+CHART_CACHE = '.chart_cache.json'
+
+
+def _bar_labels(ax, bars, text, horizontal=False, flip_negative=True, fontsize=11):
+    for bar in bars:
+        if horizontal:
+            width = bar.get_width()
+            ax.text(width, bar.get_y() + bar.get_height()/2., text(width),
+                    ha='right' if flip_negative and width <= 0 else 'left',
+                    va='center', fontsize=fontsize, fontweight='bold')
+        else:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height, text(height),
+                    ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
+
+
+def _titles(ax, title, xlabel, ylabel):
+    ax.set_title(title, fontsize=18, fontweight='bold', pad=20)
+    ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+
+
+def chart_price_trends(fig, data, preview):
+    ax = fig.add_subplot()
+    # long histories are reduced to the min/max per pixel column of the output
+    dpi = PREVIEW_DPI if preview else CHART_DPI
+    for ticker, ticker_data in data.groupby('Ticker', sort=False):
+        plot_lod(ax, ticker_data['Date'], ticker_data['Close'], dpi=dpi, label=ticker, linewidth=2.5,
+                 marker='o', markersize=2 if preview else 4, rasterized=preview)
+    _titles(ax, 'Stock Price Trends Over Time', 'Date', 'Closing Price ($)')
+    ax.legend(fontsize=10, loc='best', frameon=True, shadow=True)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def chart_trading_volume(fig, avg_volume, preview):
+    from matplotlib import colormaps
+
+    ax = fig.add_subplot()
+    colors = colormaps['viridis'](np.linspace(0, 1, len(avg_volume)))
+    bars = ax.bar(avg_volume.index, avg_volume.values, color=colors, edgecolor='black', linewidth=1.5)
+    _titles(ax, 'Average Trading Volume by Stock', 'Ticker', 'Average Volume (Millions)')
+    ax.tick_params(axis='x', labelrotation=45, labelsize=11)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    _bar_labels(ax, bars, lambda height: f'{int(height/1e6)}M', fontsize=10)
+
+
+def chart_stock_performance(fig, change, preview):
+    ax = fig.add_subplot()
+    colors = ['#2ecc71' if x > 0 else '#e74c3c' for x in change]
+    bars = ax.barh(change.index, change.values, color=colors, edgecolor='black', linewidth=1.5)
+    _titles(ax, 'Stock Performance - Percentage Change', 'Percentage Change (%)', 'Ticker')
+    ax.axvline(x=0, color='black', linestyle='-', linewidth=1)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+    _bar_labels(ax, bars, lambda width: f' {width:.2f}%', horizontal=True)
+
+
+def chart_volatility(fig, volatility_sorted, preview):
+    from matplotlib import colormaps
+
+    ax = fig.add_subplot()
+    colors = colormaps['Oranges'](np.linspace(0.4, 0.9, len(volatility_sorted)))
+    bars = ax.barh(volatility_sorted.index, volatility_sorted.values, color=colors, edgecolor='black', linewidth=1.5)
+    _titles(ax, 'Stock Volatility - Standard Deviation of Returns', 'Standard Deviation (%)', 'Ticker')
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+    _bar_labels(ax, bars, lambda width: f' {width:.2f}%', horizontal=True, flip_negative=False)
+
+
+def chart_correlation_heatmap(fig, correlation_matrix, preview):
+    import seaborn as sns
+
+    ax = fig.add_subplot()
+    sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm',
+                square=True, linewidths=2, cbar_kws={"shrink": 0.8},
+                annot_kws={'fontsize': 11, 'fontweight': 'bold'},
+                vmin=-1, vmax=1, center=0, ax=ax, rasterized=preview)
+    ax.set_title('Stock Price Correlation Matrix', fontsize=18, fontweight='bold', pad=20)
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right', fontsize=11)
+    ax.tick_params(axis='y', labelrotation=0, labelsize=11)
+
+
+def chart_returns_distribution(fig, returns, preview):
+    from matplotlib import colormaps
+
+    ax = fig.add_subplot()
+    tickers = returns['Ticker'].unique()
+    df_clean = returns.dropna(subset=['Daily_Return'])
+    grouped = dict(tuple(df_clean.groupby('Ticker', sort=False)['Daily_Return']))
+    box_data = [grouped[ticker].values if ticker in grouped else np.empty(0) for ticker in tickers]
+    bp = ax.boxplot(box_data, tick_labels=tickers, patch_artist=True, notch=True, showmeans=True,
+                    flierprops={'rasterized': preview})
+    colors = colormaps['Set3'](np.linspace(0, 1, len(bp['boxes'])))
+    for patch, color in zip(bp['boxes'], colors):
+        patch.set_facecolor(color)
+        patch.set_edgecolor('black')
+        patch.set_linewidth(1.5)
+    _titles(ax, 'Distribution of Daily Returns by Stock', 'Ticker', 'Daily Return (%)')
+    ax.axhline(y=0, color='red', linestyle='--', linewidth=1.5, alpha=0.5)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.tick_params(axis='x', labelrotation=45, labelsize=11)
+
+
+def chart_sector_performance(fig, sector_avg, preview):
+    ax = fig.add_subplot()
+    colors_sector = ['#2ecc71' if x > 0 else '#e74c3c' for x in sector_avg]
+    bars = ax.barh(sector_avg.index, sector_avg.values, color=colors_sector,
+                   edgecolor='black', linewidth=1.5)
+    _titles(ax, 'Average Daily Return by Sector', 'Average Daily Return (%)', 'Sector')
+    ax.axvline(x=0, color='black', linestyle='-', linewidth=1)
+    ax.grid(axis='x', alpha=0.3, linestyle='--')
+    _bar_labels(ax, bars, lambda width: f' {width:.3f}%', horizontal=True)
+
+
+def chart_price_range(fig, price_range_avg, preview):
+    from matplotlib import colormaps
+
+    ax = fig.add_subplot()
+    colors = colormaps['Purples'](np.linspace(0.4, 0.9, len(price_range_avg)))
+    bars = ax.bar(price_range_avg.index, price_range_avg.values, color=colors,
+                  edgecolor='black', linewidth=1.5)
+    _titles(ax, 'Average Daily Price Range by Stock', 'Ticker', 'Average Price Range ($)')
+    ax.tick_params(axis='x', labelrotation=45, labelsize=11)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    _bar_labels(ax, bars, lambda height: f'${height:.2f}', fontsize=10)
+
+
+# filename, progress title, figure size, drawing function
+CHARTS = [
+    ("01_price_trends.png", "Price Trends Over Time", (14, 7), chart_price_trends),
+    ("02_trading_volume.png", "Trading Volume by Stock", (12, 7), chart_trading_volume),
+    ("03_stock_performance.png", "Stock Performance", (12, 7), chart_stock_performance),
+    ("04_volatility.png", "Volatility Comparison", (12, 7), chart_volatility),
+    ("05_correlation_heatmap.png", "Correlation Heatmap", (12, 10), chart_correlation_heatmap),
+    ("06_returns_distribution.png", "Distribution of Daily Returns", (14, 7), chart_returns_distribution),
+    ("07_sector_performance.png", "Sector Performance", (12, 7), chart_sector_performance),
+    ("08_price_range.png", "Price Range Analysis", (12, 7), chart_price_range),
+]
+
+
+def chart_inputs(df, results) -> Dict[str, object]:
+    """
+    the aggregate each chart is drawn from, keyed by chart filename
+    """
+    return {
+        "01_price_trends.png": df[['Ticker', 'Date', 'Close']],
+        "02_trading_volume.png": df.groupby('Ticker')['Volume'].mean().sort_values(ascending=False),
+        "03_stock_performance.png": results["performance"]['Change_%'],
+        "04_volatility.png": results["volatility"].sort_values(ascending=True),
+        "05_correlation_heatmap.png": results["correlation"],
+        "06_returns_distribution.png": df[['Ticker', 'Daily_Return']],
+        "07_sector_performance.png": df.groupby('Sector')['Daily_Return'].mean().sort_values(),
+        "08_price_range.png": df.groupby('Ticker')['Price_Range'].mean().sort_values(ascending=False),
+    }
+
+
+def _hash_code(digest, code):
+    """
+    feed a code object into digest without anything that differs between
+    runs: nested code objects (lambdas, comprehensions) are hashed the same
+    way instead of by their repr, which contains their memory address, and
+    frozenset constants are sorted since their order follows string hashing
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _hash_code(digest, const)
+        elif isinstance(const, frozenset):
+            digest.update(repr(sorted(map(repr, const))).encode())
+        else:
+            digest.update(repr(const).encode())
+
+
+def chart_hash(data, draw, dpi, preview) -> str:
+    """
+    fingerprint of a chart's input, drawing code and render settings
+    """
+    digest = hashlib.sha1(f"{dpi}:{preview}:{draw.__name__}".encode())
+    _hash_code(digest, draw.__code__)
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr(list(data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_chart(path, figsize, draw, data, dpi=CHART_DPI, preview=False) -> float:
+    """
+    draw one chart on an Agg canvas and save it; returns seconds taken
+    """
+    started = time.perf_counter()
+    import matplotlib
+    import matplotlib.style
+    import seaborn as sns
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with matplotlib.rc_context():
+        matplotlib.style.use('seaborn-v0_8-darkgrid')
+        sns.set_palette("husl")
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        draw(fig, data, preview)
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return time.perf_counter() - started
+
+
+def _load_chart_cache(path) -> Dict[str, str]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_charts(inputs, out_dir='.', preview=False, workers=None, force=False) -> List[str]:
+    """
+    8. render the charts in inputs (see chart_inputs) as separate png files
+    charts render in parallel worker processes; a chart is skipped when its
+    file exists and the hash of its input, code and settings matches the last
+    run. preview renders at PREVIEW_DPI with rasterized markers. returns the
+    chart paths
+    """
+    _section("8. GENERATING VISUALIZATIONS")
+    os.makedirs(out_dir, exist_ok=True)
+    dpi = PREVIEW_DPI if preview else CHART_DPI
+    cache_path = os.path.join(out_dir, CHART_CACHE)
+    cache = _load_chart_cache(cache_path)
+
+    todo = []
+    paths = []
+    for number, (filename, title, figsize, draw) in enumerate(CHARTS, 1):
+        if filename not in inputs:
+            continue
+        path = os.path.join(out_dir, filename)
+        paths.append(path)
+        key = chart_hash(inputs[filename], draw, dpi, preview)
+        if not force and cache.get(filename) == key and os.path.exists(path):
+            print(f"Chart {number}: {title} unchanged, kept '{path}'")
+            count("stock.charts_skipped")
+        else:
+            todo.append((number, filename, title, path, figsize, draw, key))
+
+    with stage("stock.chart_render", rows=len(todo)):
+        workers = min(len(todo), workers or os.cpu_count() or 1)
+        if workers <= 1:
+            done = ((item, render_chart(item[3], item[4], item[5], inputs[item[1]], dpi, preview))
+                    for item in todo)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            futures = [(item, pool.submit(render_chart, item[3], item[4], item[5], inputs[item[1]], dpi, preview))
+                       for item in todo]
+            done = ((item, future.result()) for item, future in futures)
+        try:
+            for (number, filename, title, path, _, _, key), seconds in done:
+                print(f"✓ Chart {number}: {title} saved as '{path}' ({seconds:.1f}s)")
+                cache[filename] = key
+                count("stock.charts_rendered")
+        finally:
+            if workers > 1:
+                pool.shutdown()
+            with open(cache_path, "w") as file:
+                json.dump(cache, file, indent=2)
+
+    print(f"\n✓ All {len(paths)} visualizations saved as separate PNG files! ({len(todo)} rendered)")
+    print(f"  Files: {', '.join(os.path.basename(path) for path in paths)}")
+    return paths
+
+
+def show_charts(paths):
+    """
+    open saved charts in pyplot windows, for interactive runs
+    """
+    import matplotlib.image as mpimg
+    import matplotlib.pyplot as plt
+
+    for path in paths:
+        fig, ax = plt.subplots(figsize=(12, 7))
+        ax.imshow(mpimg.imread(path))
+        ax.set_axis_off()
+        fig.tight_layout()
+    plt.show()
+
+
+def print_insights(results):
+    """
+    9. key insights & findings
+    """
+    _section("9. KEY INSIGHTS & FINDINGS")
+    perf = results["performance"]
+    vol = results["volatility"]
+    volume = results["volume_stats"]
+    correlation_matrix = results["correlation"]
+
+    print("\n📈 BEST PERFORMERS:")
+    for idx, row in perf.nlargest(3, 'Change_%').iterrows():
+        print(f"   {idx}: +{row['Change_%']:.2f}% (${row['Start_Price']:.2f} → ${row['End_Price']:.2f})")
+
+    print("\n📉 WORST PERFORMERS:")
+    for idx, row in perf.nsmallest(3, 'Change_%').iterrows():
+        print(f"   {idx}: {row['Change_%']:.2f}% (${row['Start_Price']:.2f} → ${row['End_Price']:.2f})")
+
+    print("\n⚡ MOST VOLATILE STOCKS:")
+    for ticker in vol.nlargest(3).index:
+        print(f"   {ticker}: {vol[ticker]:.2f}% std dev")
+
+    print("\n🔄 HIGHEST TRADING VOLUME:")
+    for ticker in volume.nlargest(3, 'mean').index:
+        print(f"   {ticker}: {volume.loc[ticker, 'mean']:,.0f} shares avg")
+
+    print("\n🔗 HIGHLY CORRELATED PAIRS:")
+    corr_pairs = []
+    for i in range(len(correlation_matrix.columns)):
+        for j in range(i+1, len(correlation_matrix.columns)):
+            corr_pairs.append({
+                'Stock1': correlation_matrix.columns[i],
+                'Stock2': correlation_matrix.columns[j],
+                'Correlation': correlation_matrix.iloc[i, j]
+            })
+    corr_df = pd.DataFrame(corr_pairs).sort_values('Correlation', ascending=False)
+    print(corr_df.head(3).to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="stock market exploratory data analysis")
+    parser.add_argument("path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--out-dir", default=".", help="where the chart png files go")
+    parser.add_argument("--preview", action="store_true", help=f"fast charts at {PREVIEW_DPI} dpi")
+    parser.add_argument("--workers", type=int, help="chart worker processes (default: one per cpu)")
+    parser.add_argument("--force", action="store_true", help="re-render charts even if unchanged")
+    parser.add_argument("--show", action="store_true", help="open the charts when done")
+    parser.add_argument("--state", help="incremental mode: fold path's rows into this .npz state "
+                                        "(built from path on the first run) and report from it")
+    parser.add_argument("--no-charts", action="store_true", help="skip the charts")
+    parser.add_argument("--tickers", help="comma-separated tickers to analyze (default: all)")
+    parser.add_argument("--start", help="first date to analyze, YYYY-MM-DD")
+    parser.add_argument("--end", help="last date to analyze, YYYY-MM-DD")
+    parser.add_argument("--no-cache", action="store_true", help="parse the csv instead of using its cache")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    if args.state:
+        refresh(args.state, args.path, args.out_dir, args.preview, args.workers, args.force,
+                charts=not args.no_charts)
+        return
+
+    memory = {}
+    df = load_prices(args.path, report=memory, cache=not args.no_cache,
+                     tickers=args.tickers.split(',') if args.tickers else None, start=args.start, end=args.end)
+
+    print("="*80)
+    print("STOCK MARKET EXPLORATORY DATA ANALYSIS")
+    print("="*80)
+
+    print_overview(df, memory)
+    df = prepare(df)
+    results = analyze(df)
+    print_analysis(df, results)
+    paths = [] if args.no_charts else save_charts(chart_inputs(df, results), args.out_dir,
+                                                  args.preview, args.workers, args.force)
+    print_insights(results)
+
+    print("\n" + "="*80)
+    print("EDA COMPLETE! 🎉")
+    print("="*80)
+    if paths:
+        print("\nVisualizations saved:")
+        for path in paths:
+            print(f"  {path}")
+    else:
+        print("\nNo visualizations were saved (--no-charts).")
+
+    if args.show:
+        show_charts(paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,506 @@
 import datetime
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
 
-transactions = []
+import numpy as np
 
-def add_income(amount, description="Income"):
-    transactions.append({
-        "type": "income", 
-        "amount": amount, 
-        "description": description, 
-        "date": datetime.datetime.now()
+totals = {"income": 0.0, "expense": 0.0}
+ledger = None
+
+
+class Ledger:
+    def __init__(self, filename="budget.db"):
+        """
+        durable transaction log in sqlite with running aggregates
+        every add updates the overall, per-day and per-month totals in the same
+        sqlite transaction, so summaries are lookups instead of scans
+        """
+        self.filename = filename
+        self.db = sqlite3.connect(filename)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY,
+                type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                description TEXT NOT NULL,
+                ts REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS totals (
+                type TEXT PRIMARY KEY,
+                amount REAL NOT NULL,
+                count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT NOT NULL,
+                type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (period, type)
+            ) WITHOUT ROWID;
+        """)
+        self.totals = {"income": 0.0, "expense": 0.0}
+        self.counts = {"income": 0, "expense": 0}
+        for kind, amount, count in self.db.execute("SELECT type, amount, count FROM totals"):
+            self.totals[kind] = amount
+            self.counts[kind] = count
+
+    def add(self, kind, amount, description, date: Optional[datetime.datetime] = None):
+        """
+        append one transaction and bump every running aggregate it touches
+        """
+        date = date or datetime.datetime.now()
+        with self.db:
+            self._insert(kind, amount, description, date)
+        self.totals[kind] = self.totals.get(kind, 0.0) + amount
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def _insert(self, kind, amount, description, date):
+        self.db.execute("INSERT INTO transactions (type, amount, description, ts) VALUES (?, ?, ?, ?)",
+                        (kind, amount, description, date.timestamp()))
+        self.db.execute(
+            "INSERT INTO totals VALUES (?, ?, 1) ON CONFLICT(type) DO UPDATE SET "
+            "amount = amount + excluded.amount, count = count + 1", (kind, amount))
+        self.db.executemany(
+            "INSERT INTO rollups VALUES (?, ?, ?, 1) ON CONFLICT(period, type) DO UPDATE SET "
+            "amount = amount + excluded.amount, count = count + 1",
+            ((date.strftime("%Y-%m-%d"), kind, amount), (date.strftime("%Y-%m"), kind, amount)))
+
+    def add_many(self, kinds, amounts, descriptions, dates) -> int:
+        """
+        append many transactions in one sqlite transaction
+        rollups are pre-aggregated per (period, type) so each bucket is
+        updated once per batch instead of once per row
+        """
+        rows = []
+        buckets: Dict[Tuple[str, str], List[float]] = {}
+        for kind, amount, description, date in zip(kinds, amounts, descriptions, dates):
+            amount = float(amount)
+            rows.append((kind, amount, description, date.timestamp()))
+            for period in (date.strftime("%Y-%m-%d"), date.strftime("%Y-%m")):
+                bucket = buckets.setdefault((period, kind), [0.0, 0])
+                bucket[0] += amount
+                bucket[1] += 1
+        if not rows:
+            return 0
+        added: Dict[str, List[float]] = {}
+        for kind, amount, _, _ in rows:
+            entry = added.setdefault(kind, [0.0, 0])
+            entry[0] += amount
+            entry[1] += 1
+        with self.db:
+            self.db.executemany("INSERT INTO transactions (type, amount, description, ts) VALUES (?, ?, ?, ?)",
+                                rows)
+            self.db.executemany(
+                "INSERT INTO totals VALUES (?, ?, ?) ON CONFLICT(type) DO UPDATE SET "
+                "amount = amount + excluded.amount, count = count + excluded.count",
+                ((kind, total, count) for kind, (total, count) in added.items()))
+            self.db.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?) ON CONFLICT(period, type) DO UPDATE SET "
+                "amount = amount + excluded.amount, count = count + excluded.count",
+                ((period, kind, total, count) for (period, kind), (total, count) in buckets.items()))
+        for kind, (total, count) in added.items():
+            self.totals[kind] = self.totals.get(kind, 0.0) + total
+            self.counts[kind] = self.counts.get(kind, 0) + count
+        return len(rows)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        overall income, expense and balance from the running totals
+        """
+        income, expense = self.totals["income"], self.totals["expense"]
+        return {"income": income, "expense": expense, "balance": income - expense}
+
+    def period_summary(self, period: str) -> Dict[str, float]:
+        """
+        income, expense and balance for one day ("2024-05-01") or month ("2024-05")
+        """
+        result = {"income": 0.0, "expense": 0.0}
+        for kind, amount in self.db.execute("SELECT type, amount FROM rollups WHERE period = ?",
+                                            (period,)):
+            result[kind] = amount
+        result["balance"] = result["income"] - result["expense"]
+        return result
+
+    def iter_transactions(self) -> Iterator[dict]:
+        for kind, amount, description, ts in self.db.execute(
+                "SELECT type, amount, description, ts FROM transactions ORDER BY id"):
+            yield {"type": kind, "amount": amount, "description": description,
+                   "date": datetime.datetime.fromtimestamp(ts)}
+
+    def close(self):
+        self.db.close()
+
+
+class TransactionColumns:
+    def __init__(self, capacity=1024):
+        """
+        columnar in-memory transactions: float64 amounts, int64 epoch seconds,
+        a uint8 code into the type table and an int32 code into a deduplicated
+        description table - about 21 bytes per row instead of a dict per row
+        """
+        self.size = 0
+        self.amount = np.empty(capacity, dtype=np.float64)
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.type_code = np.empty(capacity, dtype=np.uint8)
+        self.desc_code = np.empty(capacity, dtype=np.int32)
+        self.types: List[str] = ["income", "expense"]
+        self.descriptions: List[str] = []
+        self._type_ids = {kind: i for i, kind in enumerate(self.types)}
+        self._desc_ids: Dict[str, int] = {}
+        self._sorted = True
+
+    def _code(self, table, ids, value):
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(table)
+            table.append(value)
+        return code
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self.amount):
+            return
+        capacity = max(needed, 2 * len(self.amount))
+        for name in ("amount", "ts", "type_code", "desc_code"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, kind, amount, description, ts):
+        self.extend([kind], [amount], [description], [ts])
+
+    def extend(self, kinds, amounts, descriptions, ts):
+        """
+        bulk append rows; ts are epoch seconds (or datetimes)
+        """
+        if not isinstance(ts, np.ndarray):
+            ts = [int(t.timestamp()) if isinstance(t, datetime.datetime) else int(t) for t in ts]
+        n = len(ts)
+        self._reserve(n)
+        end = self.size + n
+        self.amount[self.size:end] = amounts
+        self.ts[self.size:end] = ts
+        self.type_code[self.size:end] = [self._code(self.types, self._type_ids, k) for k in kinds]
+        self.desc_code[self.size:end] = [self._code(self.descriptions, self._desc_ids, d)
+                                         for d in descriptions]
+        if self._sorted and n:
+            prev = self.ts[self.size - 1:end] if self.size else self.ts[self.size:end]
+            self._sorted = bool(np.all(prev[1:] >= prev[:-1]))
+        self.size = end
+
+    @classmethod
+    def from_ledger(cls, ledger: "Ledger") -> "TransactionColumns":
+        columns = cls()
+        cursor = ledger.db.execute("SELECT type, amount, description, ts FROM transactions ORDER BY ts, id")
+        while True:
+            rows = cursor.fetchmany(100_000)
+            if not rows:
+                break
+            kinds, amounts, descriptions, ts = zip(*rows)
+            columns.extend(kinds, amounts, descriptions, ts)
+        return columns
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+        order = np.argsort(self.ts[:self.size], kind="stable")
+        for name in ("amount", "ts", "type_code", "desc_code"):
+            column = getattr(self, name)
+            column[:self.size] = column[:self.size][order]
+        self._sorted = True
+
+    def range(self, start=None, end=None) -> Tuple[int, int]:
+        """
+        row span [lo, hi) with start <= ts < end, found by binary search
+        """
+        self._ensure_sorted()
+        ts = self.ts[:self.size]
+        lo = 0 if start is None else int(np.searchsorted(ts, _epoch(start), side="left"))
+        hi = self.size if end is None else int(np.searchsorted(ts, _epoch(end), side="left"))
+        return lo, max(lo, hi)
+
+    def totals(self, start=None, end=None) -> Dict[str, float]:
+        """
+        total amount per type within a time range
+        """
+        lo, hi = self.range(start, end)
+        sums = np.bincount(self.type_code[lo:hi], weights=self.amount[lo:hi],
+                           minlength=len(self.types))
+        result = {kind: float(total) for kind, total in zip(self.types, sums)}
+        result["balance"] = result.get("income", 0.0) - result.get("expense", 0.0)
+        return result
+
+    def group_by_description(self, start=None, end=None, kind=None) -> Dict[str, float]:
+        """
+        total amount per description within a time range, optionally one type only
+        """
+        lo, hi = self.range(start, end)
+        codes = self.desc_code[lo:hi]
+        weights = self.amount[lo:hi]
+        if kind is not None:
+            mask = self.type_code[lo:hi] == self._type_ids.get(kind, -1)
+            codes, weights = codes[mask], weights[mask]
+        sums = np.bincount(codes, weights=weights, minlength=len(self.descriptions))
+        used = np.flatnonzero(np.bincount(codes, minlength=len(self.descriptions)))
+        return {self.descriptions[code]: float(sums[code]) for code in used}
+
+    def group_by_type(self, start=None, end=None) -> Dict[str, Tuple[float, int]]:
+        """
+        (total, count) per type within a time range
+        """
+        lo, hi = self.range(start, end)
+        codes = self.type_code[lo:hi]
+        sums = np.bincount(codes, weights=self.amount[lo:hi], minlength=len(self.types))
+        counts = np.bincount(codes, minlength=len(self.types))
+        return {kind: (float(sums[i]), int(counts[i])) for i, kind in enumerate(self.types)}
+
+    def page(self, start=None, end=None, page=0, page_size=50) -> List[dict]:
+        """
+        one page of transactions within a time range as dicts
+        """
+        lo, hi = self.range(start, end)
+        first = lo + page * page_size
+        rows = []
+        for i in range(first, min(hi, first + page_size)):
+            rows.append({
+                "type": self.types[self.type_code[i]],
+                "amount": float(self.amount[i]),
+                "description": self.descriptions[self.desc_code[i]],
+                "date": datetime.datetime.fromtimestamp(int(self.ts[i])),
+            })
+        return rows
+
+    def __len__(self):
+        return self.size
+
+    def nbytes(self) -> int:
+        return self.size * (self.amount.itemsize + self.ts.itemsize
+                            + self.type_code.itemsize + self.desc_code.itemsize)
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime.datetime):
+        return int(value.timestamp())
+    if isinstance(value, datetime.date):
+        return int(datetime.datetime.combine(value, datetime.time()).timestamp())
+    if isinstance(value, str):
+        return int(datetime.datetime.fromisoformat(value).timestamp())
+    return int(value)
+
+
+columns = TransactionColumns()
+
+
+def __getattr__(name):
+    # `transactions` used to be a list of dicts kept next to the columns;
+    # it is now built from them on access, so it always matches the data
+    if name == "transactions":
+        return columns.page(page_size=max(len(columns), 1))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def open_ledger(filename="budget.db"):
+    """
+    persist every following add_income/add_expense to filename
+    """
+    global ledger, columns
+    ledger = Ledger(filename)
+    totals.update(ledger.totals)
+    columns = TransactionColumns.from_ledger(ledger)
+    return ledger
+
+
+def _row_hashes(ts, amounts, kinds, descriptions) -> np.ndarray:
+    """
+    64-bit hash per transaction over (second, cent amount, type, description)
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "ts": np.asarray(ts, dtype=np.float64).astype(np.int64),
+        "cents": np.round(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64),
+        "type": np.asarray(kinds, dtype=object),
+        "description": np.asarray(descriptions, dtype=object),
     })
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _ledger_hashes(ledger) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    sorted distinct row hashes in the ledger and how often each occurs
+    """
+    rows = ledger.db.execute("SELECT ts, amount, type, description FROM transactions").fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    ts, amounts, kinds, descriptions = zip(*rows)
+    return np.unique(_row_hashes(ts, amounts, kinds, descriptions), return_counts=True)
+
+
+def _hash_counts(keys, counts, hashes) -> np.ndarray:
+    """
+    count of each of hashes in the sorted (keys, counts) index, 0 if absent
+    """
+    if not len(keys):
+        return np.zeros(len(hashes), dtype=np.int64)
+    at = np.minimum(np.searchsorted(keys, hashes), len(keys) - 1)
+    return np.where(keys[at] == hashes, counts[at], 0)
+
+
+def _occurrences(hashes) -> np.ndarray:
+    """
+    for each row, how many earlier rows have the same hash
+    """
+    order = np.argsort(hashes, kind="stable")
+    ordered = hashes[order]
+    starts = np.r_[True, ordered[1:] != ordered[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(len(ordered)), 0))
+    rank = np.empty(len(hashes), dtype=np.int64)
+    rank[order] = np.arange(len(ordered)) - group_start
+    return rank
+
+
+def _guess_date_format(values, dayfirst) -> str:
+    """
+    strptime format of the first parseable date, so the rest parse vectorized
+    """
+    from pandas.tseries.api import guess_datetime_format
+
+    for value in values:
+        guessed = guess_datetime_format(value, dayfirst=dayfirst) if value else None
+        if guessed:
+            return guessed
+    return "mixed"
+
+
+def import_statement(path, date_col="Date", amount_col="Amount", description_col="Description",
+                     debit_col=None, credit_col=None, date_format=None, dayfirst=False,
+                     chunksize=100_000) -> Dict[str, int]:
+    """
+    stream a bank csv export into the open ledger
+    amounts come from one signed column (negative = expense) or from separate
+    debit/credit columns. dates and amounts are parsed per chunk with pandas
+    and every chunk is committed as one batch. the n-th occurrence of a row
+    in the file is skipped if the ledger already holds n of that row, so
+    re-importing a statement adds nothing while genuinely repeated
+    transactions (two identical coffees on one day) are all kept
+    """
+    import pandas as pd
+
+    if ledger is None:
+        raise RuntimeError("open_ledger() must be called before importing statements")
+    known, known_counts = _ledger_hashes(ledger)
+    seen, seen_counts = np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    stats = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+
+    def to_number(column):
+        cleaned = column.astype(str).str.replace(r"[^\d.\-]", "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce")
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False):
+        stats["rows"] += len(chunk)
+        if date_format is None:
+            date_format = _guess_date_format(chunk[date_col], dayfirst)
+        dates = pd.to_datetime(chunk[date_col], format=date_format, dayfirst=dayfirst, errors="coerce")
+        if debit_col is not None or credit_col is not None:
+            credit = to_number(chunk[credit_col]).fillna(0) if credit_col else 0
+            debit = to_number(chunk[debit_col]).fillna(0) if debit_col else 0
+            signed = credit - debit.abs() if debit_col else credit
+        else:
+            signed = to_number(chunk[amount_col])
+        descriptions = chunk[description_col].str.strip() if description_col in chunk else \
+            pd.Series("Imported", index=chunk.index)
+
+        valid = dates.notna() & signed.notna() & (signed != 0)
+        stats["invalid"] += int((~valid).sum())
+        dates, signed, descriptions = dates[valid], signed[valid], descriptions[valid]
+        kinds = np.where(signed.to_numpy() >= 0, "income", "expense")
+        amounts = signed.abs().to_numpy()
+        py_dates = list(dates.dt.to_pydatetime())
+        ts = np.fromiter((d.timestamp() for d in py_dates), dtype=np.float64, count=len(py_dates))
+
+        hashes = _row_hashes(ts, amounts, kinds, descriptions.to_numpy())
+        occurrence = _hash_counts(seen, seen_counts, hashes) + _occurrences(hashes)
+        fresh = occurrence >= _hash_counts(known, known_counts, hashes)
+        stats["duplicates"] += int(len(hashes) - fresh.sum())
+        seen, inverse = np.unique(np.concatenate([seen, hashes]), return_inverse=True)
+        seen_counts = np.bincount(inverse, weights=np.concatenate([seen_counts, np.ones(len(hashes))]),
+                                  minlength=len(seen)).astype(np.int64)
+
+        keep = np.flatnonzero(fresh)
+        if len(keep):
+            new_descriptions = descriptions.to_numpy()[keep]
+            new_dates = [py_dates[i] for i in keep]
+            ledger.add_many(kinds[keep], amounts[keep], new_descriptions, new_dates)
+            columns.extend(kinds[keep].tolist(), amounts[keep], new_descriptions.tolist(), ts[keep].astype(np.int64))
+            stats["imported"] += len(keep)
+
+    totals.update(ledger.totals)
+    return stats
+
+
+def _record(kind, amount, description):
+    date = datetime.datetime.now()
+    columns.append(kind, amount, description, date)
+    totals[kind] += amount
+    if ledger is not None:
+        ledger.add(kind, amount, description, date)
+
+
+def add_income(amount, description="Income"):
+    _record("income", amount, description)
 
 def add_expense(amount, description="Expense"):
-    transactions.append({
-        "type": "expense", 
-        "amount": amount, 
-        "description": description, 
-        "date": datetime.datetime.now()
-    })
+    _record("expense", amount, description)
 
 def show_summary():
-    total_income = sum(t["amount"] for t in transactions if t["type"] == "income")
-    total_expense = sum(t["amount"] for t in transactions if t["type"] == "expense")
+    total_income = totals["income"]
+    total_expense = totals["expense"]
     balance = total_income - total_expense
     print(f"Total Income: {total_income}")
     print(f"Total Expense: {total_expense}")
     print(f"Balance: {balance}")
 
-def show_transactions():
-    for t in transactions:
-        print(f"{t['date'].strftime('%Y-%m-%d %H:%M:%S')} - {t['description']}: {t['amount']} ({t['type']})")
+def show_period_summary(period):
+    if ledger is None:
+        print("Period summaries need an open ledger.")
+        return
+    summary = ledger.period_summary(period)
+    print(f"{period} Income: {summary['income']}")
+    print(f"{period} Expense: {summary['expense']}")
+    print(f"{period} Balance: {summary['balance']}")
+
+def show_transactions(start=None, end=None, page_size=None):
+    """
+    print transactions with start <= date < end, page_size rows at a time
+    """
+    page = 0
+    while True:
+        rows = columns.page(start, end, page, page_size or max(len(columns), 1))
+        for t in rows:
+            print(f"{t['date'].strftime('%Y-%m-%d %H:%M:%S')} - {t['description']}: {t['amount']} ({t['type']})")
+        page += 1
+        if page_size is None or len(rows) < page_size:
+            break
+        if input("More? (y/n): ").lower() != "y":
+            break
 
 def main():
+    open_ledger()
     while True:
         print("\nBudget Tracker")
         print("1. Add Income")
         print("2. Add Expense")
         print("3. Show Summary")
         print("4. Show Transactions")
-        print("5. Exit")
-        
+        print("5. Show Day/Month Summary")
+        print("6. Import Bank Statement (CSV)")
+        print("7. Exit")
+
         choice = input("Choose an option: ")
-        
+
         if choice == "1":
             try:
                 amount = float(input("Enter income amount: "))
@@ -58,11 +518,28 @@ def main():
         elif choice == "3":
             show_summary()
         elif choice == "4":
-            show_transactions()
+            start = input("From date (YYYY-MM-DD, blank for all): ").strip() or None
+            end = input("To date, exclusive (YYYY-MM-DD, blank for all): ").strip() or None
+            try:
+                show_transactions(start, end, page_size=50)
+            except ValueError:
+                print("Invalid date. Please use YYYY-MM-DD.")
         elif choice == "5":
+            show_period_summary(input("Enter day (YYYY-MM-DD) or month (YYYY-MM): ").strip())
+        elif choice == "6":
+            path = input("Enter CSV path: ").strip()
+            try:
+                stats = import_statement(path)
+                print(f"Imported {stats['imported']} of {stats['rows']} rows "
+                      f"({stats['duplicates']} duplicates, {stats['invalid']} invalid).")
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Import failed: {e}")
+        elif choice == "7":
             break
         else:
             print("Invalid choice. Please try again.")
+    ledger.close()
 
 
-main()
+if __name__ == "__main__":
+    main()
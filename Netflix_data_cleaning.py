@@ -1,40 +1,78 @@
+import sys
+
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-df = pd.read_csv("C:/Users/tasfi/OneDrive/Documents/GitHub/my_work/vs_code/netflix_titles.csv")
-
-##print(df.head())
-print("Original shape:", df.shape)
-
-# Remove duplicates
-df.drop_duplicates(inplace=True)
-
-# Handle missing values
-df['director'].fillna('Unknown', inplace=True)
-df['cast'].fillna('Not Specified', inplace=True)
-df['country'].fillna('Not Specified', inplace=True)
-df['date_added'] = pd.to_datetime(df['date_added'])
-df['rating'].fillna('Unknown', inplace=True)
-df['duration'].fillna('Unknown', inplace=True)
-
-# Strip whitespaces from columns
-df.columns = df.columns.str.strip()
-
-# Save cleaned file
-df.to_csv('netflix_titles_cleaned.csv', index=False)
-
-print("Cleaned shape:", df.shape)
-
-sns.countplot(data=df, x='type', palette='Set2')
-plt.title("Content Type Distribution")
-plt.xlabel("Type")
-plt.ylabel("Count")
-plt.savefig("type_distribution.png")
-plt.show()
-
-top_countries = df['country'].value_counts().head(10)
-top_countries.plot(kind='barh', color='tomato')
-plt.title("Top 10 Content Producing Countries")
-plt.xlabel("Number of Titles")
-plt.savefig("")
-plt.show()
+
+from data_loader import read_csv_cached
+from instrumentation import stage, timed
+
+DATA_PATH = "C:/Users/tasfi/OneDrive/Documents/GitHub/my_work/vs_code/netflix_titles.csv"
+
+
+@timed("netflix.cleaning", count="arg")
+def clean_titles(df) -> pd.DataFrame:
+    """
+    drop duplicates, fill missing values and parse date_added
+    """
+    # Remove duplicates
+    df = df.drop_duplicates()
+
+    # Handle missing values
+    df = df.fillna({'director': 'Unknown', 'cast': 'Not Specified', 'country': 'Not Specified',
+                    'rating': 'Unknown', 'duration': 'Unknown'})
+    df['date_added'] = pd.to_datetime(df['date_added'].str.strip(), format="%B %d, %Y")
+
+    # Strip whitespaces from columns
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def top_countries(df, n=10) -> pd.Series:
+    return df['country'].value_counts().head(n)
+
+
+@timed("netflix.chart_render", count="arg")
+def plot_type_distribution(df, path="type_distribution.png"):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.countplot(data=df, x='type', hue='type', palette='Set2', legend=False)
+    plt.title("Content Type Distribution")
+    plt.xlabel("Type")
+    plt.ylabel("Count")
+    plt.savefig(path)
+    plt.show()
+
+
+@timed("netflix.chart_render", count="arg")
+def plot_top_countries(df, path="top_countries.png"):
+    import matplotlib.pyplot as plt
+
+    top_countries(df).plot(kind='barh', color='tomato')
+    plt.title("Top 10 Content Producing Countries")
+    plt.xlabel("Number of Titles")
+    plt.savefig(path)
+    plt.show()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    with stage("netflix.csv_load") as s:
+        df = read_csv_cached(argv[0] if argv else DATA_PATH)
+        s.rows = len(df)
+
+    ##print(df.head())
+    print("Original shape:", df.shape)
+
+    df = clean_titles(df)
+
+    # Save cleaned file
+    df.to_csv('netflix_titles_cleaned.csv', index=False)
+
+    print("Cleaned shape:", df.shape)
+
+    plot_type_distribution(df)
+    plot_top_countries(df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+benchmark cases, one per hot path
+
+each case has a setup(n) that builds its input outside the timed region and
+a run(data) that is timed; run returns the number of rows it processed
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, NamedTuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import generators  # noqa: E402
+from run import load_script  # noqa: E402
+
+
+class Case(NamedTuple):
+    setup: Callable
+    run: Callable
+
+
+CASES: Dict[str, Case] = {}
+
+
+def benchmark(name):
+    def register(setup):
+        def wrap(run):
+            CASES[name] = Case(setup, run)
+            return run
+        return wrap
+    return register
+
+
+# ---- business idea generator ------------------------------------------------
+
+def _generator(n):
+    from business_idea_generator import BusinessIdeaGenerator
+
+    generator = BusinessIdeaGenerator.__new__(BusinessIdeaGenerator)
+    generator.csv_file_path = None
+    generator.business_data = generators.business_data(n)
+    return generator, generators.user_skills()
+
+
+@benchmark("find_matching_businesses")(_generator)
+def _(data):
+    generator, skills = data
+    generator.find_matching_businesses(skills, min_matches=1)
+    return len(generator.business_data)
+
+
+@benchmark("calculate_skill_match")(_generator)
+def _(data):
+    generator, skills = data
+    for business in generator.business_data:
+        generator.calculate_skill_match(skills, business['skills'])
+    return len(generator.business_data)
+
+
+# ---- stock market eda ---------------------------------------------------------
+
+def _stock(n):
+    return load_script("stock-eda").prepare(generators.stock_prices(n))
+
+
+@benchmark("stock_aggregations")(_stock)
+def _(df):
+    eda = load_script("stock-eda")
+    eda.price_stats(df)
+    eda.performance(df)
+    eda.volatility(df)
+    eda.volume_stats(df)
+    eda.sector_performance(df)
+    return len(df)
+
+
+@benchmark("stock_correlation")(_stock)
+def _(df):
+    load_script("stock-eda").correlation(df)
+    return len(df)
+
+
+def _stock_csv(n):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_stock_"), "prices.csv")
+    generators.stock_prices(n).to_csv(path, index=False)
+    return path
+
+
+@benchmark("stock_compact_load")(_stock_csv)
+def _(path):
+    return len(load_script("stock-eda").load_prices(path, cache=False))
+
+
+def _stock_cached_csv(n):
+    path = _stock_csv(n)
+    load_script("stock-eda").load_prices(path)  # builds the cache
+    return path
+
+
+@benchmark("stock_cached_load")(_stock_cached_csv)
+def _(path):
+    return len(load_script("stock-eda").load_prices(path))
+
+
+def _stock_refresh(n):
+    eda = load_script("stock-eda")
+    df = generators.stock_prices(n)
+    last = df['Date'].max()
+    state = eda.TickerState()
+    state.update(df[df['Date'] < last])
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_stock_"), "state.npz")
+    state.save(path)
+    return path, df[df['Date'] == last]
+
+
+@benchmark("stock_daily_refresh")(_stock_refresh)
+def _(data):
+    eda = load_script("stock-eda")
+    path, day = data
+    state = eda.TickerState.load(path)
+    state.update(day)
+    state.results()
+    return len(day)
+
+
+# ---- financial risk analyzer --------------------------------------------------
+
+def _risk(n):
+    risk = load_script("risk")
+    df = generators.risk_prices(n).set_index('Date')
+    return risk.daily_returns(risk.price_matrix(df))
+
+
+@benchmark("risk_covariance")(_risk)
+def _(returns):
+    returns_np = returns.to_numpy()
+    np.cov(returns_np.T)
+    np.corrcoef(returns_np.T)
+    returns.cov()
+    returns.corr()
+    return len(returns)
+
+
+@benchmark("risk_minimize")(_risk)
+def _(returns):
+    load_script("risk").optimize_min_variance(np.cov(returns.to_numpy().T)[:5, :5])
+    return len(returns)
+
+
+# ---- netflix cleaning ---------------------------------------------------------
+
+@benchmark("netflix_cleaning")(generators.netflix_titles)
+def _(raw):
+    netflix = load_script("netflix")
+    netflix.top_countries(netflix.clean_titles(raw))
+    return len(raw)
+
+
+# ---- currency converter -------------------------------------------------------
+
+@benchmark("convert_currency")(generators.conversions)
+def _(rows):
+    from currency_converter import convert_currency
+
+    for amount, src, dst in rows:
+        convert_currency(amount, src, dst)
+    return len(rows)
+
+
+# ---- student management -------------------------------------------------------
+
+def _records(n):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_students_"), "student_records.txt")
+    return generators.student_records(path, n)
+
+
+@benchmark("load_students")(_records)
+def _(path):
+    from student_management import load_students
+
+    return len(load_students(path))
+
+
+# ---- budget tracker -----------------------------------------------------------
+
+def _budget(n):
+    import Budget_tracker
+
+    rows = generators.transactions(n)
+    Budget_tracker.columns = Budget_tracker.TransactionColumns()
+    Budget_tracker.columns.extend([t["type"] for t in rows], [t["amount"] for t in rows],
+                                  [t["description"] for t in rows], [t["date"] for t in rows])
+    totals = Budget_tracker.columns.totals()
+    Budget_tracker.totals.update(income=totals["income"], expense=totals["expense"])
+    return Budget_tracker
+
+
+@benchmark("budget_summary")(_budget)
+def _(budget):
+    with contextlib.redirect_stdout(io.StringIO()):
+        budget.show_summary()
+    return len(budget.columns)
+
+
+@benchmark("budget_range_totals")(_budget)
+def _(budget):
+    budget.columns.totals("2024-01-02", "2024-01-05")
+    budget.columns.totals()
+    return len(budget.columns)
@@ -0,0 +1,128 @@
+"""
+synthetic data shaped like the inputs of each script, at several sizes
+"""
+import datetime
+import random
+import string
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"small": 1_000, "medium": 10_000, "large": 100_000}
+
+SKILL_WORDS = ["python", "marketing", "social", "media", "design", "graphic", "sales", "writing",
+               "content", "cooking", "baking", "photography", "video", "editing", "accounting",
+               "teaching", "data", "analysis", "web", "development", "customer", "service",
+               "negotiation", "management", "project", "fitness", "coaching", "sewing", "crafts"]
+SECTORS = ["Technology", "Finance", "Healthcare", "Energy", "Retail", "Industrials"]
+
+
+def _skill(rng: random.Random) -> str:
+    return " ".join(rng.sample(SKILL_WORDS, rng.randint(1, 3)))
+
+
+def business_data(n: int, seed=0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [{
+        'id': i,
+        'idea': f"business idea {i}",
+        'category': rng.choice(SECTORS).lower(),
+        'skills': [_skill(rng) for _ in range(5)],
+    } for i in range(n)]
+
+
+def user_skills(seed=1) -> List[str]:
+    rng = random.Random(seed)
+    return [_skill(rng) for _ in range(5)]
+
+
+def stock_prices(n_rows: int, n_tickers=20, seed=0) -> pd.DataFrame:
+    """
+    rows like the stock_market_eda.py input: Date,Ticker,Open,High,Low,Close,Volume,Sector
+    """
+    rng = np.random.default_rng(seed)
+    n_days = max(n_rows // n_tickers, 2)
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    dates = pd.bdate_range("2015-01-01", periods=n_days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_tickers)), axis=0))
+    frame = pd.DataFrame({
+        "Date": np.repeat(dates.strftime("%Y-%m-%d"), n_tickers),
+        "Ticker": np.tile(tickers, n_days),
+        "Close": close.ravel(),
+    })
+    frame["Open"] = frame["Close"] * (1 + rng.normal(0, 0.005, len(frame)))
+    frame["High"] = np.maximum(frame["Open"], frame["Close"]) * (1 + rng.random(len(frame)) * 0.01)
+    frame["Low"] = np.minimum(frame["Open"], frame["Close"]) * (1 - rng.random(len(frame)) * 0.01)
+    frame["Volume"] = rng.integers(1_000_000, 50_000_000, len(frame))
+    sector_of = {t: SECTORS[i % len(SECTORS)] for i, t in enumerate(tickers)}
+    frame["Sector"] = frame["Ticker"].map(sector_of)
+    return frame[["Date", "Ticker", "Open", "High", "Low", "Close", "Volume", "Sector"]]
+
+
+def risk_prices(n_rows: int, n_symbols=10, seed=0) -> pd.DataFrame:
+    """
+    rows like the risk analyzer input: Date,Symbol,Company,Sector,Price,Volume,Volatility
+    """
+    stock = stock_prices(n_rows, n_symbols, seed)
+    symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"] + [f"S{i}" for i in range(max(n_symbols - 5, 0))]
+    rename = dict(zip(sorted(stock["Ticker"].unique()), symbols))
+    return pd.DataFrame({
+        "Date": pd.to_datetime(stock["Date"]),
+        "Symbol": stock["Ticker"].map(rename),
+        "Company": stock["Ticker"].map(rename) + " Inc",
+        "Sector": stock["Sector"],
+        "Price": stock["Close"],
+        "Volume": stock["Volume"],
+        "Volatility": (stock["High"] - stock["Low"]) / stock["Close"],
+    })
+
+
+def netflix_titles(n: int, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def maybe_missing(values, share):
+        values = np.asarray(values, dtype=object)
+        values[rng.random(len(values)) < share] = np.nan
+        return values
+
+    start = datetime.date(2010, 1, 1)
+    frame = pd.DataFrame({
+        "show_id": [f"s{i}" for i in range(n)],
+        "type": rng.choice(["Movie", "TV Show"], n),
+        "title": [f"Title {i}" for i in range(n)],
+        "director": maybe_missing([f"Director {i % 500}" for i in range(n)], 0.3),
+        "cast": maybe_missing([f"Actor {i % 900}, Actor {(i * 7) % 900}" for i in range(n)], 0.1),
+        "country": maybe_missing(rng.choice(["United States", "India", "Bangladesh", "Japan"], n), 0.1),
+        "date_added": [(start + datetime.timedelta(days=int(d))).strftime("%B %d, %Y")
+                       for d in rng.integers(0, 4000, n)],
+        "release_year": rng.integers(1980, 2024, n),
+        "rating": maybe_missing(rng.choice(["TV-MA", "PG-13", "R", "TV-14"], n), 0.01),
+        "duration": maybe_missing(rng.choice(["90 min", "1 Season", "2 Seasons"], n), 0.01),
+    })
+    return pd.concat([frame, frame.sample(frac=0.02, random_state=seed)], ignore_index=True)
+
+
+def conversions(n: int, seed=0):
+    rng = random.Random(seed)
+    codes = ["USD", "BDT", "EUR"]
+    return [(rng.random() * 1000, rng.choice(codes), rng.choice(codes)) for _ in range(n)]
+
+
+def student_records(path: str, n: int, seed=0) -> str:
+    rng = random.Random(seed)
+    with open(path, "w") as file:
+        file.writelines(f"{''.join(rng.choices(string.ascii_lowercase, k=8))},{i},"
+                        f"{rng.choice(['A+', 'A', 'A-', 'B', 'C', 'F'])}\n" for i in range(n))
+    return path
+
+
+def transactions(n: int, seed=0) -> List[dict]:
+    rng = random.Random(seed)
+    now = datetime.datetime(2024, 1, 1)
+    return [{
+        "type": rng.choice(["income", "expense"]),
+        "amount": round(rng.random() * 500, 2),
+        "description": rng.choice(["Salary", "Food", "Rent", "Transport", "Books"]),
+        "date": now + datetime.timedelta(minutes=i),
+    } for i in range(n)]
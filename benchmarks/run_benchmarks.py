@@ -0,0 +1,101 @@
+"""
+run the benchmark cases and compare them with a saved baseline
+
+    python benchmarks/run_benchmarks.py --sizes small,medium --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --threshold 1.25
+
+wall time is the median of --repeat timed runs; peak memory comes from one
+extra run under tracemalloc so it does not slow the timed runs down
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.cases import CASES  # noqa: E402
+from benchmarks.generators import SIZES  # noqa: E402
+
+
+def run_case(name, size, repeat):
+    case = CASES[name]
+    data = case.setup(SIZES[size])
+    times = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = case.run(data)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    case.run(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    median = statistics.median(times)
+    return {
+        "median_seconds": median,
+        "min_seconds": min(times),
+        "rows": rows,
+        "rows_per_second": rows / median if median else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':<36}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for key, result in results.items():
+        old = baseline.get("results", {}).get(key)
+        if not old:
+            print(f"{key:<36}{'-':>12}{result['median_seconds']:>12.4f}{'new':>8}")
+            continue
+        ratio = result["median_seconds"] / old["median_seconds"] if old["median_seconds"] else 1.0
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key:<36}{old['median_seconds']:>12.4f}{result['median_seconds']:>12.4f}{ratio:>8.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmark the scripts' hot paths")
+    parser.add_argument("--sizes", default="small,medium", help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument("--only", default="", help="comma separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write results to this json file")
+    parser.add_argument("--compare", help="baseline json to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail when a median is this many times the baseline")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.only.split(",") if n] or list(CASES)
+    results = {}
+    print(f"{'benchmark':<36}{'median s':>10}{'rows/s':>14}{'peak MiB':>10}")
+    for name in names:
+        for size in args.sizes.split(","):
+            key = f"{name}[{size}]"
+            result = run_case(name, size, args.repeat)
+            results[key] = result
+            print(f"{key:<36}{result['median_seconds']:>10.4f}{result['rows_per_second']:>14,.0f}"
+                  f"{result['peak_bytes'] / 2**20:>10.1f}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": results}, file, indent=2)
+        print(f"\nsaved {len(results)} results to {args.save}")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
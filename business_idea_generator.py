@@ -2,6 +2,8 @@ import csv
 import re
 from typing import List, Dict, Tuple
 
+from instrumentation import stage
+
 class BusinessIdeaGenerator:
     def __init__(self):
         """
@@ -16,7 +18,8 @@ class BusinessIdeaGenerator:
         load business data from csv file
         """
         try:
-            with open(self.csv_file_path, 'r', encoding='utf-8') as file:
+            with open(self.csv_file_path, 'r', encoding='utf-8') as file, \
+                    stage("business.csv_load") as s:
                 csv_reader = csv.DictReader(file)
                 for row in csv_reader:
                     business_info = {
@@ -32,6 +35,7 @@ class BusinessIdeaGenerator:
                         ]
                     }
                     self.business_data.append(business_info)
+                s.rows = len(self.business_data)
             print(f"successfully loaded {len(self.business_data)} business ideas from csv file")
         except FileNotFoundError:
             print(f"error: csv file '{self.csv_file_path}' not found")
@@ -110,19 +114,20 @@ class BusinessIdeaGenerator:
         """
         matching_businesses = []
         
-        for business in self.business_data:
-            match_count, matched_skills = self.calculate_skill_match(user_skills, business['skills'])
+        with stage("business.skill_matching", rows=len(self.business_data)):
+            for business in self.business_data:
+                match_count, matched_skills = self.calculate_skill_match(user_skills, business['skills'])
+                
+                if match_count >= min_matches:
+                    business_match = {
+                        'business': business,
+                        'match_count': match_count,
+                        'matched_skills': matched_skills,
+                        'match_percentage': (match_count / 5) * 100
+                    }
+                    matching_businesses.append(business_match)
             
-            if match_count >= min_matches:
-                business_match = {
-                    'business': business,
-                    'match_count': match_count,
-                    'matched_skills': matched_skills,
-                    'match_percentage': (match_count / 5) * 100
-                }
-                matching_businesses.append(business_match)
-        
-        matching_businesses.sort(key=lambda x: (x['match_count'], x['match_percentage']), reverse=True)
+            matching_businesses.sort(key=lambda x: (x['match_count'], x['match_percentage']), reverse=True)
         
         return matching_businesses
     
@@ -1,4 +1,12 @@
-import matplotlib.pyplot as plt
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from instrumentation import stage, timed
+
 food_data= { "rice":{"calorie":325, "carbs":70, "fiber":1, "protein":7, "fat":3.4},
             "chicken":{"calorie":239, "carbs":0, "fiber":0, "protein":27, "fat":14},
             "cucumber":{"calorie":16, "carbs":4, "fiber":1, "protein":1, "fat":0},
@@ -12,6 +20,254 @@ food_data= { "rice":{"calorie":325, "carbs":70, "fiber":1, "protein":7, "fat":3.
             "yogurt":{"calorie":59, "carbs":4, "fiber":0, "protein":10, "fat":0.4},
             "cheese":{"calorie":402, "carbs":1, "fiber":0, "protein":25, "fat":33},
             "biryani":{"calorie":300, "carbs":45, "fiber":2, "protein":10, "fat":10},}
+
+NUTRIENTS = ["calorie", "carbs", "fiber", "protein", "fat"]
+
+
+class NutritionEngine:
+    def __init__(self, foods: Dict[str, Dict[str, float]]):
+        """
+        food table as a (foods x nutrients) matrix of values per 100 g
+        a meal log becomes a grams-per-food vector, and its nutrients are one
+        vector-matrix product with that table
+        """
+        self.names: List[str] = list(foods)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.table = np.array([[float(foods[name].get(n, 0.0)) for n in NUTRIENTS]
+                               for name in self.names], dtype=np.float64).reshape(-1, len(NUTRIENTS))
+        self.per_gram = self.table / 100.0
+
+    @classmethod
+    def from_csv(cls, path) -> "NutritionEngine":
+        """
+        load a food table csv with a food column and one column per nutrient
+        """
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            foods = {row["food"].strip().lower(): {n: float(row.get(n) or 0) for n in NUTRIENTS}
+                     for row in csv.DictReader(file)}
+        return cls(foods)
+
+    def __contains__(self, food):
+        return food in self.index
+
+    def food_ids(self, foods: Sequence[str]) -> np.ndarray:
+        """
+        row ids for food names; raises KeyError for unknown foods
+        """
+        return np.fromiter((self.index[food] for food in foods), dtype=np.intp, count=len(foods))
+
+    def nutrients(self, food: str, grams: float) -> np.ndarray:
+        """
+        nutrient vector for one portion
+        """
+        return self.per_gram[self.index[food]] * grams
+
+    def quantity_vector(self, foods: Sequence[str], grams: Sequence[float]) -> np.ndarray:
+        """
+        total grams eaten of every food in the table
+        """
+        return np.bincount(self.food_ids(foods), weights=np.asarray(grams, dtype=np.float64),
+                           minlength=len(self.names))
+
+    def log_totals(self, foods: Sequence[str], grams: Sequence[float]) -> np.ndarray:
+        """
+        nutrient totals of a whole day's or week's log in one product
+        """
+        return self.quantity_vector(foods, grams) @ self.per_gram
+
+    def batch_totals(self, group_ids, food_ids, grams, n_groups=None) -> np.ndarray:
+        """
+        nutrient totals for many logs at once, shape (groups x nutrients)
+        group_ids can be users or user-days; this is the product of the sparse
+        (groups x foods) quantity matrix with the food table, computed with
+        bincount so the dense quantity matrix is never built
+        """
+        group_ids = np.asarray(group_ids, dtype=np.intp)
+        food_ids = np.asarray(food_ids, dtype=np.intp)
+        grams = np.asarray(grams, dtype=np.float64)
+        if n_groups is None:
+            n_groups = int(group_ids.max()) + 1 if len(group_ids) else 0
+        entries = self.per_gram[food_ids] * grams[:, None]
+        result = np.empty((n_groups, len(NUTRIENTS)))
+        for j in range(len(NUTRIENTS)):
+            result[:, j] = np.bincount(group_ids, weights=entries[:, j], minlength=n_groups)
+        return result
+
+    def batch_quantities(self, quantities: np.ndarray) -> np.ndarray:
+        """
+        nutrient totals for a dense (logs x foods) grams matrix
+        """
+        return np.asarray(quantities, dtype=np.float64) @ self.per_gram
+
+
+# other names people type for foods in the table
+FOOD_SYNONYMS = {
+    "bhaat": "rice", "bhat": "rice", "murgi": "chicken", "shosha": "cucumber",
+    "soda": "coke", "cola": "coke", "coca cola": "coke", "anaras": "pineapple",
+    "komola": "orange", "cookie": "biscuit", "cookies": "biscuit", "dahi": "yogurt",
+    "doi": "yogurt", "curd": "yogurt", "biriyani": "biryani",
+}
+
+
+def _trigrams(text: str) -> List[str]:
+    text = f"  {text.lower().strip()} "
+    return sorted({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+class FoodIndex:
+    def __init__(self, names: Sequence[str], synonyms: Optional[Dict[str, str]] = None):
+        """
+        trigram inverted index over food names and their synonyms
+        each indexed term points at a food; postings are int32 arrays, so a
+        query is a bincount over the postings of its trigrams
+        """
+        synonyms = synonyms or {}
+        food_id = {name: i for i, name in enumerate(names)}
+        terms = list(names) + [s for s, target in synonyms.items() if target in food_id]
+        term_food = list(range(len(names))) + [food_id[synonyms[s]] for s in terms[len(names):]]
+        postings: Dict[str, List[int]] = {}
+        term_size = []
+        for term_id, term in enumerate(terms):
+            grams = _trigrams(term)
+            term_size.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        keys = sorted(postings)
+        lengths = np.array([len(postings[k]) for k in keys], dtype=np.int64)
+        self._setup(
+            names=np.array(list(names), dtype=object),
+            terms=np.array(terms, dtype=object),
+            term_food=np.array(term_food, dtype=np.int32),
+            term_size=np.array(term_size, dtype=np.int32),
+            keys=np.array(keys, dtype=object),
+            offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            postings=np.array([t for k in keys for t in postings[k]], dtype=np.int32),
+        )
+
+    def _setup(self, names, terms, term_food, term_size, keys, offsets, postings):
+        self.names = names
+        self.terms = terms
+        self.term_food = term_food
+        self.term_size = term_size
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.gram_id = {key: i for i, key in enumerate(keys.tolist())}
+        self.exact = {term: int(food) for term, food in zip(terms.tolist(), term_food.tolist())}
+
+    def save(self, path):
+        """
+        write the prebuilt index as an uncompressed .npz
+        """
+        np.savez(path, names=self.names.astype(str), terms=self.terms.astype(str),
+                 term_food=self.term_food, term_size=self.term_size,
+                 keys=self.keys.astype(str), offsets=self.offsets, postings=self.postings)
+
+    @classmethod
+    def load(cls, path) -> "FoodIndex":
+        """
+        load a prebuilt index without re-tokenizing any names
+        """
+        index = cls.__new__(cls)
+        with np.load(path) as data:
+            index._setup(data["names"].astype(object), data["terms"].astype(object),
+                         data["term_food"], data["term_size"], data["keys"].astype(object),
+                         data["offsets"], data["postings"])
+        return index
+
+    @classmethod
+    def load_or_build(cls, path, names, synonyms=None) -> "FoodIndex":
+        if path and os.path.exists(path):
+            return cls.load(path)
+        index = cls(names, synonyms)
+        if path:
+            index.save(path)
+        return index
+
+    def search(self, query: str, limit=5, min_score=0.3) -> List[Tuple[str, float]]:
+        """
+        ranked (food, score) matches; score is the dice coefficient of trigrams
+        """
+        query = query.lower().strip()
+        if query in self.exact:
+            return [(self.names[self.exact[query]], 1.0)]
+        query_grams = _trigrams(query)
+        grams = [self.gram_id[g] for g in query_grams if g in self.gram_id]
+        if not grams:
+            return []
+        hits = np.bincount(np.concatenate([self.postings[self.offsets[g]:self.offsets[g + 1]]
+                                           for g in grams]), minlength=len(self.terms))
+        candidates = np.flatnonzero(hits)
+        scores = 2.0 * hits[candidates] / (len(query_grams) + self.term_size[candidates])
+        # keep the best term per food, so a food and its synonym count once
+        order = np.lexsort((-scores, self.term_food[candidates]))
+        foods = self.term_food[candidates][order]
+        first = np.r_[True, foods[1:] != foods[:-1]]
+        foods, scores = foods[first], scores[order][first]
+        keep = scores >= min_score
+        foods, scores = foods[keep], scores[keep]
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            foods, scores = foods[top], scores[top]
+        ranked = np.lexsort((foods, -scores))
+        return [(self.names[f], float(s)) for f, s in zip(foods[ranked], scores[ranked])]
+
+    def resolve(self, query: str, min_score=0.5) -> Optional[str]:
+        """
+        the food a query most likely means, or None
+        """
+        matches = self.search(query, limit=1, min_score=min_score)
+        return matches[0][0] if matches else None
+
+
+engine = NutritionEngine(food_data)
+food_index = FoodIndex(engine.names, FOOD_SYNONYMS)
+
+
+def load_meal_log(path, index: FoodIndex = None):
+    """
+    read a user,food,grams csv for batch scoring
+    food names are resolved through the fuzzy index; returns user names,
+    per-row user ids, food ids, grams and the rows that could not be resolved
+    """
+    index = index or food_index
+    users: Dict[str, int] = {}
+    user_ids, food_ids, grams, unresolved = [], [], [], []
+    resolved: Dict[str, Optional[str]] = {}
+    with open(path, "r", newline="", encoding="utf-8") as file, stage("calories.csv_load") as s:
+        for row in csv.DictReader(file):
+            s.rows += 1
+            food = row["food"]
+            if food not in resolved:
+                resolved[food] = index.resolve(food)
+            if resolved[food] is None:
+                unresolved.append(row)
+                continue
+            user_ids.append(users.setdefault(row["user"], len(users)))
+            food_ids.append(engine.index[resolved[food]])
+            grams.append(float(row["grams"]))
+    return (list(users), np.array(user_ids, dtype=np.intp), np.array(food_ids, dtype=np.intp),
+            np.array(grams, dtype=np.float64), unresolved)
+
+
+def suggest_food(food_item):
+    """
+    offer fuzzy matches for an unknown food and return the one picked
+    """
+    matches = food_index.search(food_item, limit=3)
+    if not matches:
+        return food_item
+    if matches[0][1] == 1.0:
+        return matches[0][0]
+    print("Did you mean:")
+    for i, (name, _) in enumerate(matches, 1):
+        print(f"{i}. {name}")
+    choice = input("Enter the number of the food you meant (or press enter to skip): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(matches):
+        return matches[int(choice) - 1][0]
+    return food_item
+
+
 def bmr_calculator():
     print("Welcome to the Calorie Tracker!")
     gender = input("enter your gender(male/female):").lower()
@@ -25,60 +281,110 @@ def bmr_calculator():
         bmr = 88.362 + (13.7 * weight) + (4.799 * height) - (5.677 * age)
         
     print(f"Hello {name}, your Basal Metabolic Rate (BMR) is: {bmr:.2f} calories/day")
-    return bmr
-bmr_calculator= bmr_calculator()
-maintenance_cal=round( bmr_calculator * 1.2)
-loss_cal=round( bmr_calculator * 0.8)
-gain_cal=round( bmr_calculator * 1.5)
-
-total_calories = 0
-total_carbs=0
-totsl_fiber=0
-total_protein=0
-total_fat=0
-while True:
-    food_item = input("Enter the food item you consumed (or type 'exit' to finish): ").lower()
-    if food_item == 'exit':
-        break
-    if food_item in food_data:
-        quantity = float(input(f"Enter the quantity of {food_item} consumed (in grams): "))
-        calories = (food_data[food_item]["calorie"] / 100) * quantity
-        carbs = (food_data[food_item]["carbs"] / 100) * quantity
-        fiber = (food_data[food_item]["fiber"] / 100) * quantity
-        protein = (food_data[food_item]["protein"] / 100) * quantity
-        fat = (food_data[food_item]["fat"] / 100) * quantity
-        
-        total_calories += calories
-        total_carbs += carbs
-        totsl_fiber += fiber
-        total_protein += protein
-        total_fat += fat
-        
-        print(f"{quantity}g of {food_item} contains {calories:.2f} calories, {carbs:.2f}g carbs, {fiber:.2f}g fiber, {protein:.2f}g protein, and {fat:.2f}g fat.")
-    else:
-        print("Food item not found. Please try again.")
-        
-        lebels = [ 'Carbs', 'Fiber', 'Protein', 'Fat']
-        values = [ total_carbs*4, totsl_fiber*2, total_protein*4, total_fat*9]
-        
-        plt.pie(values, labels=lebels, autopct='%1.1f%%', startangle=140)
-        plt.title('Macronutrient Distribution')
-        plt.show()
-        
-        category = ['maintanace_calories', 'loss_calories', 'gain_calories']
-        values = [maintenance_cal, loss_cal, gain_cal]
-        plt.figure(figsize=(8, 5))
-        bars= plt.bar(category, values, color=['blue', 'orange', 'green'])
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width() / 2, height, f'{height}', ha='center', va='bottom')
-        plt.title('Caloric Needs')
-        plt.ylabel('Calories(kcal)')
-        plt.show()
-        
-        
-        
-        
+    return bmr, name
+
+
+# figures are created once per process and cleared between reports
+_report_figures = {}
+
+
+def _report_figure(kind, figsize):
+    """
+    reusable Agg-backed figure; importing matplotlib only happens here
+    """
+    fig = _report_figures.get(kind)
+    if fig is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _report_figures[kind] = fig
+    fig.clear()
+    return fig
+
+
+@timed("calories.chart_render")
+def render_report(report, out_dir="."):
+    """
+    draw the macronutrient pie and caloric needs bar chart for one user to png files
+    report holds name, totals (calorie, carbs, fiber, protein, fat) and bmr
+    """
+    name = report["name"]
+    _, total_carbs, totsl_fiber, total_protein, total_fat = report["totals"]
+    bmr = report["bmr"]
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    lebels = [ 'Carbs', 'Fiber', 'Protein', 'Fat']
+    values = [ total_carbs*4, totsl_fiber*2, total_protein*4, total_fat*9]
+    fig = _report_figure("macros", (6, 6))
+    ax = fig.add_subplot()
+    if sum(values) > 0:
+        ax.pie(values, labels=lebels, autopct='%1.1f%%', startangle=140)
+    ax.set_title('Macronutrient Distribution')
+    paths.append(os.path.join(out_dir, f"{name}_macros.png"))
+    fig.savefig(paths[-1])
+
+    category = ['maintanace_calories', 'loss_calories', 'gain_calories']
+    values = [round(bmr * 1.2), round(bmr * 0.8), round(bmr * 1.5)]
+    fig = _report_figure("needs", (8, 5))
+    ax = fig.add_subplot()
+    bars= ax.bar(category, values, color=['blue', 'orange', 'green'])
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2, height, f'{height}', ha='center', va='bottom')
+    ax.set_title('Caloric Needs')
+    ax.set_ylabel('Calories(kcal)')
+    paths.append(os.path.join(out_dir, f"{name}_caloric_needs.png"))
+    fig.savefig(paths[-1])
+    return paths
+
+
+def _render_batch(reports, out_dir):
+    return [render_report(report, out_dir) for report in reports]
+
+
+def render_reports(reports, out_dir=".", workers=None, batch_size=50):
+    """
+    render many users' daily reports in parallel worker processes
+    reports are sent in batches so each worker reuses its figures
+    """
+    reports = list(reports)
+    if workers == 1 or len(reports) <= batch_size:
+        return _render_batch(reports, out_dir)
+    batches = [reports[i:i + batch_size] for i in range(0, len(reports), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_render_batch, batches, [out_dir] * len(batches))
+        return [paths for batch in results for paths in batch]
+
+
+def main():
+    bmr, name = bmr_calculator()
+
+    logged_foods = []
+    logged_grams = []
+    while True:
+        food_item = input("Enter the food item you consumed (or type 'exit' to finish): ").lower()
+        if food_item == 'exit':
+            break
+        if food_item not in engine:
+            food_item = suggest_food(food_item)
+        if food_item in engine:
+            quantity = float(input(f"Enter the quantity of {food_item} consumed (in grams): "))
+            calories, carbs, fiber, protein, fat = engine.nutrients(food_item, quantity)
+            logged_foods.append(food_item)
+            logged_grams.append(quantity)
+
+            print(f"{quantity}g of {food_item} contains {calories:.2f} calories, {carbs:.2f}g carbs, {fiber:.2f}g fiber, {protein:.2f}g protein, and {fat:.2f}g fat.")
+        else:
+            print("Food item not found. Please try again.")
+
+    if input("Save report charts? (y/n): ").lower().startswith("y"):
+        report = {"name": name, "bmr": bmr, "totals": engine.log_totals(logged_foods, logged_grams)}
+        for path in render_report(report):
+            print(f"Saved {path}")
 
 
-        
\ No newline at end of file
+if __name__ == "__main__":
+    main()
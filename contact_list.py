@@ -1,60 +1,391 @@
-contacts={}
-def add_contacts():
+import csv
+import json
+import math
+import sqlite3
+import sys
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+Contact = Tuple[str, Dict[str, str]]
+
+
+def trigrams(text: str) -> set:
+    """
+    padded, lowercase character trigrams of text
+    """
+    text = f"  {text.lower().strip()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _index_trigrams(text: str) -> set:
+    """
+    the unpadded trigrams the fts5 trigram tokenizer indexes for text
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _match_term(tri: str) -> str:
+    return '"' + tri.replace('"', '""') + '"'
+
+
+class ContactStore:
+    def __init__(self, filename="contacts.db"):
+        """
+        persistent contact book in sqlite
+        names are indexed lowercase for prefix search, and name, phone and email
+        are indexed by an fts5 trigram index over the contacts table for fuzzy
+        lookup. updates and deletes reach the index through triggers; new rows
+        are indexed by _insert_new in batches, which is much faster than a
+        per-row insert trigger
+        """
+        self.filename = filename
+        self.db = sqlite3.connect(filename)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        had_index = self.db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'contact_index'").fetchone() is not None
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS contacts (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                name_key TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                email TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS contacts_name_order ON contacts(name_key, name);
+            DROP TABLE IF EXISTS contact_trigrams;
+            CREATE VIRTUAL TABLE IF NOT EXISTS contact_index USING fts5(
+                name, phone, email, content='contacts', content_rowid='id',
+                tokenize='trigram', detail='none');
+            CREATE TRIGGER IF NOT EXISTS contacts_index_delete AFTER DELETE ON contacts BEGIN
+                INSERT INTO contact_index (contact_index, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+            END;
+            CREATE TRIGGER IF NOT EXISTS contacts_index_update AFTER UPDATE ON contacts BEGIN
+                INSERT INTO contact_index (contact_index, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+                INSERT INTO contact_index (rowid, name, phone, email)
+                VALUES (new.id, new.name, new.phone, new.email);
+            END;
+            CREATE VIRTUAL TABLE IF NOT EXISTS temp.contact_vocab USING fts5vocab(main, contact_index, row);
+        """)
+        if not had_index:
+            with self.db:
+                self.db.execute("INSERT INTO contact_index (contact_index) VALUES ('rebuild')")
+        self._doc_freq: Optional[Dict[str, int]] = None
+
+    @staticmethod
+    def _row(row) -> Contact:
+        return row[0], {"Phone": row[1], "Email": row[2]}
+
+    def _contact_trigrams(self, name, phone, email) -> set:
+        return trigrams(name) | trigrams(phone) | trigrams(email)
+
+    def _upsert(self, rows: Dict[str, Tuple[str, str]]):
+        """
+        write {name: (phone, email)}; call inside a transaction
+        """
+        names = list(rows)
+        existing = set()
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            existing.update(name for name, in self.db.execute(
+                f"SELECT name FROM contacts WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+        self.db.executemany("UPDATE contacts SET phone = ?, email = ? WHERE name = ?",
+                            ((*rows[name], name) for name in existing))
+        new = [name for name in names if name not in existing]
+        first_id = (self.db.execute("SELECT MAX(id) FROM contacts").fetchone()[0] or 0) + 1
+        self.db.executemany("INSERT INTO contacts (id, name, name_key, phone, email) VALUES (?, ?, ?, ?, ?)",
+                            ((first_id + i, name, name.lower(), *rows[name]) for i, name in enumerate(new)))
+        self.db.executemany("INSERT INTO contact_index (rowid, name, phone, email) VALUES (?, ?, ?, ?)",
+                            ((first_id + i, name, *rows[name]) for i, name in enumerate(new)))
+
+    def add(self, name, phone, email):
+        """
+        add a contact, or replace the phone and email of an existing one
+        """
+        with self.db:
+            self._upsert({name: (phone, email)})
+        if self._doc_freq is not None:
+            # count the new trigrams so the contact is searchable straight away;
+            # an over-count after an update only makes a probe look commoner
+            for tri in set().union(*(_index_trigrams(text) for text in (name, phone, email))):
+                self._doc_freq[tri] = self._doc_freq.get(tri, 0) + 1
+
+    def get(self, name) -> Optional[Contact]:
+        row = self.db.execute("SELECT name, phone, email FROM contacts WHERE name = ?",
+                              (name,)).fetchone()
+        return self._row(row) if row else None
+
+    def delete(self, name) -> bool:
+        with self.db:
+            row = self.db.execute("SELECT id FROM contacts WHERE name = ?", (name,)).fetchone()
+            if not row:
+                return False
+            self.db.execute("DELETE FROM contacts WHERE id = ?", row)
+        return True
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def __bool__(self):
+        return self.db.execute("SELECT 1 FROM contacts LIMIT 1").fetchone() is not None
+
+    def prefix_search(self, prefix, limit=20) -> List[Contact]:
+        """
+        contacts whose name starts with prefix (case-insensitive), in name order
+        """
+        low = prefix.lower()
+        rows = self.db.execute(
+            "SELECT name, phone, email FROM contacts WHERE name_key >= ? AND name_key < ? "
+            "ORDER BY name_key LIMIT ?", (low, low + "\uffff", limit))
+        return [self._row(row) for row in rows]
+
+    def doc_freq(self) -> Dict[str, int]:
+        """
+        how many contacts contain each trigram, read once from the index
+        it only steers which trigrams fuzzy_search probes: it is reloaded after
+        bulk imports, bumped by add, and left as is by delete, since a count
+        that is too high only makes a probe look commoner than it is
+        """
+        if self._doc_freq is None:
+            self._doc_freq = dict(self.db.execute("SELECT term, doc FROM contact_vocab"))
+        return self._doc_freq
+
+    def fuzzy_search(self, query, limit=10, min_score=0.3,
+                     max_candidates=1_000) -> List[Tuple[Contact, float]]:
+        """
+        best trigram matches of query against names, phones and emails
+        score is the share of the query's trigrams found in the contact. a
+        contact reaching min_score must contain at least one of the query's
+        rarest (n - needed + 1) indexed trigrams, so only their postings are
+        read, rarest first and up to max_candidates ids; the contacts hit most
+        often are then scored exactly. trigrams found in most contacts ("mai"
+        of every @mail.com) are only read when nothing rarer is left, and when
+        even the rarest one has more postings than the budget, the two rarest
+        are intersected first so the budget goes to contacts holding both
+        """
+        query_tris = trigrams(query)
+        indexed = _index_trigrams(query.strip())
+        if not indexed:
+            return []
+        doc_freq = self.doc_freq()
+        needed = max(1, math.ceil(min_score * len(query_tris)) - (len(query_tris) - len(indexed)))
+        probes = sorted((tri for tri in indexed if doc_freq.get(tri, 0)), key=doc_freq.get)
+        probes = probes[:max(1, len(probes) - needed + 1)] if probes else []
+        expressions = [_match_term(tri) for tri in probes]
+        if len(probes) > 1 and doc_freq[probes[0]] > max_candidates:
+            expressions.insert(0, f"{expressions[0]} AND {expressions[1]}")
+
+        hits: Counter = Counter()
+        budget = max_candidates
+        for expression in expressions:
+            if budget <= 0:
+                break
+            ids = self.db.execute("SELECT rowid FROM contact_index WHERE contact_index MATCH ? LIMIT ?",
+                                  (expression, budget)).fetchall()
+            hits.update(contact_id for contact_id, in ids)
+            budget -= len(ids)
+        if not hits:
+            return []
+
+        shortlist = [contact_id for contact_id, _ in hits.most_common(max(limit * 5, 50))]
+        rows = self.db.execute(
+            f"SELECT name, phone, email FROM contacts WHERE id IN ({','.join('?' * len(shortlist))})",
+            shortlist)
+        results = []
+        for name, phone, email in rows:
+            score = len(query_tris & self._contact_trigrams(name, phone, email)) / len(query_tris)
+            if score >= min_score:
+                results.append(((name, {"Phone": phone, "Email": email}), score))
+        results.sort(key=lambda item: (-item[1], item[0][0].lower()))
+        return results[:limit]
+
+    def search(self, query, limit=10) -> List[Contact]:
+        """
+        exact name first, then prefix matches, then fuzzy matches
+        """
+        exact = self.get(query)
+        if exact:
+            return [exact]
+        found = self.prefix_search(query, limit)
+        if found:
+            return found
+        return [contact for contact, _ in self.fuzzy_search(query, limit)]
+
+    def import_csv(self, path, batch_size=10_000) -> int:
+        """
+        bulk import name,phone,email rows, one transaction per batch
+        """
+        imported = 0
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            batch = []
+            for row in reader:
+                batch.append((row["name"], row["phone"], row["email"]))
+                if len(batch) >= batch_size:
+                    imported += self.import_rows(batch)
+                    batch = []
+            imported += self.import_rows(batch)
+        return imported
+
+    def import_rows(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        upsert many contacts in one transaction (a later row for a name wins)
+        """
+        batch = {}
+        count = 0
+        for name, phone, email in rows:
+            batch[name] = (phone, email)
+            count += 1
+        with self.db:
+            self._upsert(batch)
+        self._doc_freq = None
+        return count
+
+    def iter_pages(self, page_size=500, after: Optional[str] = None) -> Iterator[List[Contact]]:
+        """
+        contacts in name order, page_size at a time
+        uses a keyset cursor on (name_key, name), so each page is an index range
+        scan and later pages cost the same as the first; after resumes past a name
+        """
+        key = (after.lower(), after) if after is not None else None
+        while True:
+            if key is None:
+                rows = self.db.execute(
+                    "SELECT name, phone, email, name_key FROM contacts "
+                    "ORDER BY name_key, name LIMIT ?", (page_size,)).fetchall()
+            else:
+                rows = self.db.execute(
+                    "SELECT name, phone, email, name_key FROM contacts "
+                    "WHERE (name_key, name) > (?, ?) ORDER BY name_key, name LIMIT ?",
+                    (*key, page_size)).fetchall()
+            if not rows:
+                return
+            yield [self._row(row) for row in rows]
+            key = (rows[-1][3], rows[-1][0])
+            if len(rows) < page_size:
+                return
+
+    def format_pages(self, page_size=500, after: Optional[str] = None) -> Iterator[str]:
+        """
+        each page of contacts rendered as one text block
+        """
+        for page in self.iter_pages(page_size, after):
+            yield "".join(format_contact(name, info) for name, info in page)
+
+    def write_listing(self, out: TextIO = None, page_size=500) -> int:
+        """
+        stream the formatted listing to out with one write per page
+        """
+        out = out or sys.stdout
+        count = 0
+        for page in self.iter_pages(page_size):
+            out.write("".join(format_contact(name, info) for name, info in page))
+            count += len(page)
+        out.flush()
+        return count
+
+    def export(self, path, fmt="csv", page_size=5000) -> int:
+        """
+        stream all contacts to a csv or jsonl file page by page
+        """
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as file:
+            if fmt == "csv":
+                writer = csv.writer(file)
+                writer.writerow(["name", "phone", "email"])
+            elif fmt != "jsonl":
+                raise ValueError(f"unknown export format {fmt!r}, use 'csv' or 'jsonl'")
+            for page in self.iter_pages(page_size):
+                if fmt == "csv":
+                    writer.writerows((name, info["Phone"], info["Email"]) for name, info in page)
+                else:
+                    file.write("".join(
+                        json.dumps({"name": name, "phone": info["Phone"], "email": info["Email"]},
+                                   ensure_ascii=False) + "\n"
+                        for name, info in page))
+                count += len(page)
+        return count
+
+    def export_csv(self, path) -> int:
+        """
+        write all contacts as name,phone,email rows, streamed from the database
+        """
+        return self.export(path, "csv")
+
+    def items(self) -> Iterable[Contact]:
+        for page in self.iter_pages():
+            yield from page
+
+    def close(self):
+        self.db.close()
+
+
+def format_contact(name, info) -> str:
+    return f"Name:{name}\nPhone:{info['Phone']}\nEmail{info['Email']}\n\n"
+
+
+def add_contacts(store):
     name=input("enter contact name:")
     phone=input("enter phone number:")
     email=input("enter email address:")
-    contacts[name]={"Phone":phone, "Email":email}
+    store.add(name, phone, email)
     print(f"{name} added successfully.\n")
-    
-def view_contacts():
-    if not contacts:
-        print("No contacts found.\n") 
+
+def view_contacts(store):
+    if not store:
+        print("No contacts found.\n")
     else:
-        print("contacts list ")   
-        for name,info in contacts.items():
-            print(f"Name:{name}") 
-            print(f"Phone:{info['Phone']}")  
-            print(f"Email{info['Email']}\n")
- 
-def search_contacts():
-    name=input("Enter name to search: ")  
-    if name in contacts:
-        print(f"name:{name}") 
-        print(f"Phone:{contacts[name]['Phone']}") 
-        print(f"Email:{contacts[name]['Email']}\n") 
+        print("contacts list ")
+        store.write_listing()
+
+def search_contacts(store):
+    name=input("Enter name to search: ")
+    found = store.search(name)
+    if found:
+        for match, info in found:
+            print(f"name:{match}")
+            print(f"Phone:{info['Phone']}")
+            print(f"Email:{info['Email']}\n")
     else:
-        print("contact not found\n") 
-        
-def delete_contacts():
-    name=input("Enter name to delete:") 
-    if name in contacts:
-        del contacts[name]  
-        print(f"{name} deleted successfully.\n") 
+        print("contact not found\n")
+
+def delete_contacts(store):
+    name=input("Enter name to delete:")
+    if store.delete(name):
+        print(f"{name} deleted successfully.\n")
     else:
-        print("contact not found.\n")  
-        
-        
-while True:
-    print("contact book manu:") 
-    print("1.Add contact:") 
-    print("2.View contacts") 
-    print("3.Search contact") 
-    print("4.delete contact") 
-    print("5.Exit")  
-    choice= input("Enter your choice(1-5)") 
-    
-    if choice=='1':
-        add_contacts() 
-    elif choice=='2':
-        view_contacts()
-    elif choice=='3': 
-        search_contacts()
-    elif choice=='4':
-        delete_contacts() 
-    elif choice=='5':
-        print("Exiting contact book.")
-        break
-    else:
-        print("invalid choice.\n")
-                        
-            
\ No newline at end of file
+        print("contact not found.\n")
+
+
+def main():
+    store = ContactStore()
+    while True:
+        print("contact book manu:")
+        print("1.Add contact:")
+        print("2.View contacts")
+        print("3.Search contact")
+        print("4.delete contact")
+        print("5.Exit")
+        choice= input("Enter your choice(1-5)")
+
+        if choice=='1':
+            add_contacts(store)
+        elif choice=='2':
+            view_contacts(store)
+        elif choice=='3':
+            search_contacts(store)
+        elif choice=='4':
+            delete_contacts(store)
+        elif choice=='5':
+            print("Exiting contact book.")
+            break
+        else:
+            print("invalid choice.\n")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,419 @@
 # Currency Converter Project
+import csv
+import json
+import os
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+exchange_rates = {
+    ("USD", "BDT"): 110.0,
+    ("BDT", "USD"): 0.0091,
+    ("EUR", "BDT"): 117.0,
+    ("BDT", "EUR"): 0.0085,
+    ("USD", "EUR"): 0.91,
+    ("EUR", "USD"): 1.1
+}
+
+
+class RateGraph:
+    def __init__(self, rates: Dict[Tuple[str, str], float]):
+        """
+        currency graph built once from direct rates
+        pairs without a direct rate are resolved through the path with the
+        fewest hops (a listed rate is used before its inverse). all pairs are
+        resolved together into a dense rate matrix, which is rebuilt lazily
+        after any rate changes
+        """
+        self.rates: Dict[Tuple[str, str], float] = {}
+        self.currencies: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._dirty = True
+        for (src, dst), rate in rates.items():
+            self.set_rate(src, dst, rate)
+
+    def _add_currency(self, code):
+        if code not in self.ids:
+            self.ids[code] = len(self.currencies)
+            self.currencies.append(code)
+
+    def set_rate(self, from_currency, to_currency, rate):
+        """
+        add or change a direct rate; resolved cross rates are invalidated
+        """
+        self._add_currency(from_currency)
+        self._add_currency(to_currency)
+        self.rates[(from_currency, to_currency)] = float(rate)
+        self._dirty = True
+
+    def _build(self):
+        n = len(self.currencies)
+        rate = np.full((n, n), np.nan)
+        hops = np.full((n, n), np.inf)
+        # implied inverses first so listed rates overwrite them
+        for (src, dst), value in self.rates.items():
+            if value:
+                i, j = self.ids[dst], self.ids[src]
+                rate[i, j], hops[i, j] = 1.0 / value, 1.25
+        for (src, dst), value in self.rates.items():
+            i, j = self.ids[src], self.ids[dst]
+            rate[i, j], hops[i, j] = value, 1.0
+        np.fill_diagonal(rate, 1.0)
+        np.fill_diagonal(hops, 0.0)
+        via = np.full((n, n), -1, dtype=np.int64)
+        for k in range(n):
+            through = hops[:, k:k + 1] + hops[k:k + 1, :]
+            better = through < hops
+            if better.any():
+                hops = np.where(better, through, hops)
+                rate = np.where(better, rate[:, k:k + 1] * rate[k:k + 1, :], rate)
+                via = np.where(better, k, via)
+        self.matrix = rate
+        self.hops = hops
+        self._via = via
+        self._cache: Dict[Tuple[str, str], Optional[float]] = {}
+        self._dirty = False
+
+    def rate(self, from_currency, to_currency) -> Optional[float]:
+        """
+        direct or cross rate, None if the currencies are not connected
+        """
+        if self._dirty:
+            self._build()
+        key = (from_currency, to_currency)
+        if key in self._cache:
+            return self._cache[key]
+        i, j = self.ids.get(from_currency), self.ids.get(to_currency)
+        value = None
+        if i is not None and j is not None and not np.isnan(self.matrix[i, j]):
+            value = float(self.matrix[i, j])
+        self._cache[key] = value
+        return value
+
+    def path(self, from_currency, to_currency) -> Optional[List[str]]:
+        """
+        currencies the conversion goes through, including both ends
+        """
+        if self.rate(from_currency, to_currency) is None:
+            return None
+        i, j = self.ids[from_currency], self.ids[to_currency]
+
+        def expand(a, b):
+            k = self._via[a, b]
+            if k < 0:
+                return [b]
+            return expand(a, k) + expand(k, b)
+
+        return [from_currency] + [self.currencies[k] for k in expand(i, j)] if i != j else [from_currency]
+
+    def convert(self, amount, from_currency, to_currency) -> Optional[float]:
+        rate = self.rate(from_currency, to_currency)
+        return None if rate is None else amount * rate
+
+    def code_ids(self, codes) -> np.ndarray:
+        """
+        integer ids for an array of currency codes, -1 for unknown codes
+        only the distinct codes are looked up
+        """
+        codes = np.asarray(codes)
+        if codes.ndim == 0:
+            return np.asarray(self.ids.get(str(codes), -1))
+        unique, inverse = np.unique(codes.astype(str), return_inverse=True)
+        lookup = np.array([self.ids.get(code, -1) for code in unique], dtype=np.int64)
+        return lookup[inverse.reshape(codes.shape)]
+
+    def rates_for(self, from_codes, to_codes) -> np.ndarray:
+        """
+        gathered rate per row from the dense rate matrix, NaN where unresolved
+        """
+        if self._dirty:
+            self._build()
+        src, dst = np.broadcast_arrays(self.code_ids(from_codes), self.code_ids(to_codes))
+        known = (src >= 0) & (dst >= 0)
+        rates = np.full(src.shape, np.nan)
+        rates[known] = self.matrix[src[known], dst[known]]
+        return rates
+
+
+rate_graph = RateGraph(exchange_rates)
+
 
 def convert_currency(amount, from_currency, to_currency):
-    exchange_rates = {
-        ("USD", "BDT"): 110.0,
-        ("BDT", "USD"): 0.0091,
-        ("EUR", "BDT"): 117.0,
-        ("BDT", "EUR"): 0.0085,
-        ("USD", "EUR"): 0.91,
-        ("EUR", "USD"): 1.1
-    }
-
-    key = (from_currency, to_currency)
-    if key in exchange_rates:
-        return amount * exchange_rates[key]
-    else:
-        return None
+    return rate_graph.convert(amount, from_currency, to_currency)
+
+
+def _decimal_product(amount, rate, quantum) -> Decimal:
+    return (Decimal(repr(float(amount))) * Decimal(repr(float(rate)))).quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def convert_batch(amounts, from_currency, to_currency, output="float", decimals=2,
+                  graph: RateGraph = None):
+    """
+    convert whole arrays (or DataFrame columns) of amounts in one multiply
+    from_currency / to_currency are arrays of codes or single codes.
+    output="float" gives float64 (NaN for unknown pairs), "minor" gives int64
+    minor units and "decimal" gives Decimal values, both rounded half-up at
+    the given decimals from exact decimal arithmetic: minor rounds in float
+    and redoes only the rows that land near a half in Decimal
+
+    >>> graph = RateGraph({("USD", "EUR"): 1.0})
+    >>> convert_batch([1.005, -1.005, 2.675], "USD", "EUR", "minor", graph=graph).tolist()
+    [101, -101, 268]
+    >>> [str(d) for d in convert_batch([1.005], "USD", "EUR", "decimal", graph=graph)]
+    ['1.01']
+    """
+    graph = graph or rate_graph
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = np.broadcast_to(graph.rates_for(from_currency, to_currency), amounts.shape)
+    converted = amounts * rates
+    if output == "float":
+        return converted
+    quantum = Decimal(1).scaleb(-decimals)
+    if output == "minor":
+        scaled = converted * 10 ** decimals
+        if np.isnan(scaled).any():
+            raise ValueError("some currency pairs have no rate; use output='float' to get NaN")
+        minor = np.rint(scaled).astype(np.int64)
+        # float error can put a true half on either side, so settle those exactly
+        near_half = np.flatnonzero(np.abs(np.abs(scaled) % 1 - 0.5) < 1e-6)
+        flat_minor, flat_amounts, flat_rates = minor.reshape(-1), amounts.reshape(-1), rates.reshape(-1)
+        for i in near_half.tolist():
+            exact = _decimal_product(flat_amounts[i], flat_rates[i], quantum)
+            flat_minor[i] = int(exact.scaleb(decimals))
+        return minor
+    if output == "decimal":
+        return [None if rate != rate else _decimal_product(amount, rate, quantum)
+                for amount, rate in zip(amounts.ravel().tolist(), rates.ravel().tolist())]
+    raise ValueError(f"unknown output {output!r}, use 'float', 'minor' or 'decimal'")
+
+
+def convert_frame(df, amount_col, from_col, to_col, out_col="converted", **kwargs):
+    """
+    add a converted column to a DataFrame; from_col/to_col may also be fixed codes
+    """
+    from_codes = df[from_col].to_numpy() if from_col in df.columns else from_col
+    to_codes = df[to_col].to_numpy() if to_col in df.columns else to_col
+    result = df.copy()
+    result[out_col] = convert_batch(df[amount_col].to_numpy(), from_codes, to_codes, **kwargs)
+    return result
+
+
+def _epoch_seconds(values) -> np.ndarray:
+    """
+    epoch seconds from datetime64 values, ISO date strings or plain numbers
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.int64)
+    return values.astype("datetime64[s]").astype(np.int64)
+
+
+class RateHistory:
+    def __init__(self):
+        """
+        time-versioned rates: one sorted timestamp array and one rate array per
+        currency pair, stored back to back in a base segment (which can be a
+        memory-map) plus small per-pair tails for rates appended since loading
+        """
+        self.pairs: List[Tuple[str, str]] = []
+        self.pair_ids: Dict[Tuple[str, str], int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.ts = np.empty(0, dtype=np.int64)
+        self.rates = np.empty(0, dtype=np.float64)
+        self._tail: Dict[int, Tuple[List[int], List[float]]] = {}
+        self._feed_position = None
+
+    # ---- loading --------------------------------------------------------
+
+    @classmethod
+    def from_csv(cls, path) -> "RateHistory":
+        """
+        load a date,from,to,rate history file; rows may be in any order
+        """
+        history = cls()
+        with open(path, "r", newline="", encoding="utf-8") as file:
+            rows = [(row["from"].upper(), row["to"].upper(), row["date"], float(row["rate"]))
+                    for row in csv.DictReader(file)]
+        if rows:
+            src, dst, dates, rates = zip(*rows)
+            history._set_base(list(zip(src, dst)), _epoch_seconds(np.array(dates)),
+                              np.asarray(rates, dtype=np.float64))
+        return history
+
+    def _set_base(self, keys, ts, rates):
+        unique = sorted(set(keys))
+        self.pairs = unique
+        self.pair_ids = {pair: i for i, pair in enumerate(unique)}
+        pair_of_row = np.fromiter((self.pair_ids[k] for k in keys), dtype=np.int64, count=len(keys))
+        order = np.lexsort((ts, pair_of_row))
+        self.ts, self.rates = ts[order], rates[order]
+        counts = np.bincount(pair_of_row, minlength=len(unique))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._tail = {}
+
+    def save(self, directory):
+        """
+        write the store (tails merged in) as .npy files that load() can memory-map
+        """
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "ts.npy"), self.ts)
+        np.save(os.path.join(directory, "rates.npy"), self.rates)
+        np.save(os.path.join(directory, "offsets.npy"), self.offsets)
+        with open(os.path.join(directory, "pairs.json"), "w") as file:
+            json.dump(self.pairs, file)
+
+    @classmethod
+    def load(cls, directory, mmap=True) -> "RateHistory":
+        history = cls()
+        mode = "r" if mmap else None
+        history.ts = np.load(os.path.join(directory, "ts.npy"), mmap_mode=mode)
+        history.rates = np.load(os.path.join(directory, "rates.npy"), mmap_mode=mode)
+        history.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        with open(os.path.join(directory, "pairs.json")) as file:
+            history.pairs = [tuple(pair) for pair in json.load(file)]
+        history.pair_ids = {pair: i for i, pair in enumerate(history.pairs)}
+        return history
+
+    # ---- updates --------------------------------------------------------
+
+    def append(self, from_currency, to_currency, when, rate):
+        """
+        record a new rate; it must not be older than the pair's latest rate
+        """
+        key = (from_currency, to_currency)
+        ts = int(_epoch_seconds([when])[0])
+        pair = self.pair_ids.get(key)
+        if pair is None:
+            pair = self.pair_ids[key] = len(self.pairs)
+            self.pairs.append(key)
+            self.offsets = np.append(self.offsets, self.offsets[-1])
+        tail_ts, tail_rates = self._tail.setdefault(pair, ([], []))
+        last = tail_ts[-1] if tail_ts else self._base_last(pair)
+        if last is not None and ts < last:
+            raise ValueError(f"rate for {key} at {ts} is older than the latest one at {last}")
+        tail_ts.append(ts)
+        tail_rates.append(float(rate))
+
+    def follow(self, feed_path):
+        """
+        apply rates appended to a local feed file since it was last read;
+        the feed uses the same date,from,to,rate columns as the history csv
+        """
+        applied = 0
+        with open(feed_path, "r", encoding="utf-8") as file:
+            if self._feed_position is None:
+                file.readline()  # header
+            else:
+                file.seek(self._feed_position)
+            position = file.tell()
+            for line in iter(file.readline, ""):
+                if not line.endswith("\n"):
+                    break  # partially written line, pick it up next time
+                date, src, dst, rate = line.strip().split(",")
+                self.append(src.upper(), dst.upper(), np.datetime64(date), float(rate))
+                applied += 1
+                position = file.tell()
+        self._feed_position = position
+        return applied
+
+    def _base_last(self, pair):
+        start, end = self.offsets[pair], self.offsets[pair + 1]
+        return int(self.ts[end - 1]) if end > start else None
+
+    def compact(self):
+        """
+        fold appended tails into the base arrays
+        """
+        if not any(ts for ts, _ in self._tail.values()):
+            return
+        ts_parts, rate_parts, counts = [], [], []
+        for pair in range(len(self.pairs)):
+            start, end = self.offsets[pair], self.offsets[pair + 1]
+            tail_ts, tail_rates = self._tail.get(pair, ([], []))
+            ts_parts += [np.asarray(self.ts[start:end]), np.asarray(tail_ts, dtype=np.int64)]
+            rate_parts += [np.asarray(self.rates[start:end]), np.asarray(tail_rates, dtype=np.float64)]
+            counts.append(end - start + len(tail_ts))
+        self.ts = np.concatenate(ts_parts)
+        self.rates = np.concatenate(rate_parts)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._tail = {}
+
+    # ---- lookups --------------------------------------------------------
+
+    def _direct(self, pair, ts) -> np.ndarray:
+        """
+        as-of rates of one stored pair for an array of timestamps (NaN before the first rate)
+        """
+        start, end = self.offsets[pair], self.offsets[pair + 1]
+        base_ts, base_rates = self.ts[start:end], self.rates[start:end]
+        result = np.full(ts.shape, np.nan)
+        pos = np.searchsorted(base_ts, ts, side="right") - 1
+        found = pos >= 0
+        result[found] = np.asarray(base_rates)[pos[found]]
+        tail_ts, tail_rates = self._tail.get(pair, ([], []))
+        if tail_ts:
+            pos = np.searchsorted(np.asarray(tail_ts), ts, side="right") - 1
+            found = pos >= 0
+            result[found] = np.asarray(tail_rates)[pos[found]]
+        return result
+
+    def _pair_rates(self, src, dst, ts, pivot) -> np.ndarray:
+        if src == dst:
+            return np.ones(ts.shape)
+        result = np.full(ts.shape, np.nan)
+        if (src, dst) in self.pair_ids:
+            result = self._direct(self.pair_ids[(src, dst)], ts)
+        missing = np.isnan(result)
+        if missing.any() and (dst, src) in self.pair_ids:
+            result[missing] = 1.0 / self._direct(self.pair_ids[(dst, src)], ts[missing])
+            missing = np.isnan(result)
+        if missing.any() and pivot not in (src, dst):
+            via = (self._pair_rates(src, pivot, ts[missing], None)
+                   * self._pair_rates(pivot, dst, ts[missing], None)) if pivot else np.nan
+            result[missing] = via
+        return result
+
+    def rate_as_of(self, from_currency, to_currency, when, pivot="USD") -> Optional[float]:
+        """
+        rate in effect at when; pairs without history go through the inverse or the pivot
+        """
+        rate = self._pair_rates(from_currency, to_currency, _epoch_seconds([when]), pivot)[0]
+        return None if np.isnan(rate) else float(rate)
+
+    def rates_as_of(self, from_codes, to_codes, when, pivot="USD") -> np.ndarray:
+        """
+        per-row as-of rates for arrays of codes and a timestamp column
+        rows are grouped by pair so each pair does one binary search per row batch
+        """
+        src, dst, ts = np.broadcast_arrays(np.asarray(from_codes).astype(str),
+                                           np.asarray(to_codes).astype(str),
+                                           _epoch_seconds(when))
+        src, dst, ts = src.ravel(), dst.ravel(), ts.ravel()
+        keys, group = np.unique(np.char.add(np.char.add(src, "/"), dst), return_inverse=True)
+        order = np.argsort(group, kind="stable")
+        bounds = np.searchsorted(group[order], np.arange(len(keys) + 1))
+        result = np.empty(len(ts))
+        for g, key in enumerate(keys):
+            rows = order[bounds[g]:bounds[g + 1]]
+            a, b = key.split("/")
+            result[rows] = self._pair_rates(a, b, ts[rows], pivot)
+        return result
+
+
+def convert_batch_as_of(amounts, from_currency, to_currency, when, history: RateHistory,
+                        pivot="USD") -> np.ndarray:
+    """
+    convert amounts at the rates in effect at each row's timestamp
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    return amounts * history.rates_as_of(from_currency, to_currency, when, pivot).reshape(amounts.shape)
 
 
 def main():
     print("Welcome to the Currency Converter!")
-    
+
     try:
         amount = float(input("Enter amount to convert: "))
         from_currency = input("Enter FROM currency (e.g., USD, BDT, EUR): ").upper()
@@ -35,5 +429,5 @@ def main():
         print("Please enter a valid number for amount.")
 
 
-if _name_ == "_main_":
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
+import sys
+
 import pandas as pd
-df=pd.read_csv('data.csv')
-print(df.head())
-print(df.isnull().sum())
-df.fillna(method='ffill', inplace=True)
-df.dropna(inplace=True)
-print(df.duplicated().sum())
-df.drop_duplicates(inplace=True)
-df.columns=df.columns.str.strip().str.lower().str.replace(' ', '_')
-print(df.describe())
\ No newline at end of file
+
+from data_loader import read_csv_cached
+from instrumentation import timed
+
+
+@timed("data.cleaning", count="arg")
+def clean(df) -> pd.DataFrame:
+    df = df.ffill().dropna()
+    print(df.duplicated().sum())
+    df = df.drop_duplicates()
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    return df
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    df = read_csv_cached(argv[0] if argv else 'data.csv')
+    print(df.head())
+    print(df.isnull().sum())
+    df = clean(df)
+    print(df.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+compact DataFrame loading for the price datasets
+
+load_compact_csv reads a csv in chunks and stores each chunk compactly as it
+arrives, so the full float64/object frame never exists at once:
+
+    repeated strings (Ticker, Symbol, Company, Sector, ...) become categories
+    float columns become float32 when that changes no value by more than
+        `tolerance` (half a cent by default)
+    integer columns take the smallest integer type that holds them
+
+memory_report compares the footprint against the plain read_csv frame, and
+group_slices hands out per-group row ranges of a frame sorted on a column as
+iloc slices, which share the frame's data instead of copying it the way a
+boolean filter does
+
+read_csv_cached pays the csv parse once: later reads come from a columnar
+cache, limited to the columns and row groups asked for
+"""
+import hashlib
+import json
+import operator
+import os
+import shutil
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, stage
+
+PRICE_TOLERANCE = 0.005
+
+
+def frame_bytes(df) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _is_text(series) -> bool:
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def compact_chunk(chunk, categorical: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    categories for text columns (all of them unless categorical is given)
+    and the smallest integer type for integer columns
+    """
+    columns = list(categorical) if categorical is not None else \
+        [name for name in chunk.columns if _is_text(chunk[name])]
+    for name in columns:
+        if name in chunk:
+            chunk[name] = chunk[name].astype("category")
+    for name in chunk.columns:
+        if pd.api.types.is_integer_dtype(chunk[name].dtype):
+            chunk[name] = pd.to_numeric(chunk[name], downcast="integer")
+    return chunk
+
+
+def downcast_floats(df, tolerance=PRICE_TOLERANCE, columns: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    store float64 columns as float32 where the largest rounding error is at
+    most tolerance; returns the error of each column that was converted
+    """
+    converted = {}
+    for name in columns if columns is not None else df.columns:
+        if df[name].dtype != np.float64:
+            continue
+        values = df[name].to_numpy()
+        narrow = values.astype(np.float32)
+        with np.errstate(invalid="ignore"):
+            error = np.nanmax(np.abs(narrow.astype(np.float64) - values)) if len(values) else 0.0
+        if np.isnan(error) or error <= tolerance:
+            df[name] = narrow
+            converted[name] = 0.0 if np.isnan(error) else float(error)
+    return converted
+
+
+def load_compact_csv(path, categorical: Optional[Iterable[str]] = None, parse_dates=None, usecols=None,
+                     tolerance=PRICE_TOLERANCE, chunksize=500_000) -> Tuple[pd.DataFrame, Dict]:
+    """
+    read a csv into a compact frame; returns it with a memory report
+    (see memory_report) measured against the plain read_csv result
+    """
+    chunks = []
+    before = 0
+    for chunk in pd.read_csv(path, parse_dates=parse_dates, usecols=usecols, chunksize=chunksize):
+        before += frame_bytes(chunk)
+        chunks.append(compact_chunk(chunk, categorical))
+    if not chunks:
+        df = pd.read_csv(path, parse_dates=parse_dates, usecols=usecols)
+        return df, memory_report(0, df)
+
+    # chunks carry their own category sets; merge them before concatenating
+    order = list(chunks[0].columns)
+    category_columns = [name for name in order if isinstance(chunks[0][name].dtype, pd.CategoricalDtype)]
+    merged = {name: pd.api.types.union_categoricals([chunk[name] for chunk in chunks])
+              for name in category_columns}
+    df = pd.concat([chunk.drop(columns=category_columns) for chunk in chunks], ignore_index=True)
+    del chunks
+    for name in category_columns:
+        df[name] = merged.pop(name)
+    df = df[order]
+    converted = downcast_floats(df, tolerance)
+    return df, memory_report(before, df, converted)
+
+
+def memory_report(before_bytes, df, float32_errors: Optional[Dict[str, float]] = None) -> Dict:
+    after = frame_bytes(df)
+    return {
+        "before_bytes": before_bytes,
+        "after_bytes": after,
+        "saved_bytes": before_bytes - after,
+        "saved_ratio": 1 - after / before_bytes if before_bytes else 0.0,
+        "float32_columns": float32_errors or {},
+        "dtypes": {name: str(dtype) for name, dtype in df.dtypes.items()},
+    }
+
+
+def format_memory_report(report) -> str:
+    mib = 2 ** 20
+    lines = [f"Memory: {report['before_bytes'] / mib:.1f} MiB as read_csv -> "
+             f"{report['after_bytes'] / mib:.1f} MiB compact "
+             f"(saved {report['saved_bytes'] / mib:.1f} MiB, {report['saved_ratio']:.0%})"]
+    for name, error in report["float32_columns"].items():
+        lines.append(f"  {name}: float32 (max rounding error {error:.2g})")
+    return "\n".join(lines)
+
+
+def group_slices(df, column) -> Dict[object, pd.DataFrame]:
+    """
+    row range of every value of column as an iloc slice of df
+    df must be sorted on column (e.g. sort_values(column, kind='stable'));
+    the slices share df's data rather than copying the matching rows
+    """
+    values = df[column]
+    codes = values.cat.codes.to_numpy() if isinstance(values.dtype, pd.CategoricalDtype) \
+        else pd.factorize(values, sort=True)[0]
+    if len(codes) and np.any(np.diff(codes) < 0):
+        raise ValueError(f"frame is not sorted on {column!r}")
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=int)
+    ends = np.r_[starts[1:], len(codes)]
+    return {values.iat[start]: df.iloc[start:end] for start, end in zip(starts, ends)}
+
+
+# ============================================================================
+# CSV CACHE
+# the first read of a csv writes a typed columnar copy next to it (.csv_cache/),
+# later reads load only the requested columns and row groups from that copy.
+# the copy is parquet when pyarrow is installed; otherwise one .npy file per
+# column, memory-mapped on read, with per-row-group min/max kept in meta.json
+# so filters skip whole groups the same way parquet statistics do
+# ============================================================================
+
+CACHE_DIR_NAME = ".csv_cache"
+ROW_GROUP_SIZE = 100_000
+FILTER_OPS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+              "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def parquet_available() -> bool:
+    import importlib.util
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _source_signature(path) -> Dict:
+    info = os.stat(path)
+    return {"size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def cache_path(path, options: Dict, cache_dir=None, engine="parquet") -> str:
+    """
+    where the cache of path with these build options lives
+    """
+    cache_dir = cache_dir or os.environ.get("TOOLKIT_CACHE_DIR") or \
+        os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    key = hashlib.sha1(json.dumps([os.path.abspath(path), options], sort_keys=True, default=str).encode())
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key.hexdigest()[:12]}.{'parquet' if engine == 'parquet' else 'npcache'}")
+
+
+def _read_meta(cache) -> Optional[Dict]:
+    try:
+        with open(cache + ".json" if cache.endswith(".parquet") else os.path.join(cache, "meta.json")) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as file:
+        json.dump(data, file, default=str)
+    os.replace(tmp, path)
+
+
+def _column_stats(values, kind, offsets):
+    if kind in ("category", "text"):
+        values = np.where(values < 0, np.nan, values)
+    elif kind == "datetime":
+        values = values.astype("datetime64[ns]").view(np.int64).astype(np.float64)
+        values[values == np.iinfo(np.int64).min] = np.nan
+    stats = []
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        part = values[start:end].astype(np.float64)
+        part = part[~np.isnan(part)]
+        stats.append([float(part.min()), float(part.max())] if len(part) else None)
+    return stats
+
+
+def _write_npcache(df, cache, meta, row_group_size):
+    tmp = cache + ".tmp"
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    offsets = list(range(0, len(df), row_group_size)) + [len(df)]
+    meta["columns"], meta["stats"], meta["offsets"] = {}, {}, offsets
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"file": f"c{i}.npy"}
+        if _is_text(series) and pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+            # mixed values (bools with blanks, numbers and text) keep their
+            # types in a pickled object array, with no group statistics
+            entry["kind"], values = "object", series.to_numpy(dtype=object)
+        elif isinstance(series.dtype, pd.CategoricalDtype) or _is_text(series):
+            # sorted categories, so code ranges follow value ranges
+            entry["kind"] = "category" if isinstance(series.dtype, pd.CategoricalDtype) else "text"
+            codes, uniques = pd.factorize(series, sort=True)
+            values = codes.astype(np.int32 if len(uniques) >= 2**15 else np.int16)
+            entry["categories"] = [str(value) for value in uniques]
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            entry["kind"], values = "datetime", series.to_numpy()
+        else:
+            entry["kind"], values = "number", series.to_numpy()
+        np.save(os.path.join(tmp, entry["file"]), values, allow_pickle=entry["kind"] == "object")
+        meta["columns"][name] = entry
+        meta["stats"][name] = None if entry["kind"] == "object" else _column_stats(values, entry["kind"], offsets)
+    _write_json(os.path.join(tmp, "meta.json"), meta)
+    if os.path.isdir(cache):
+        shutil.rmtree(cache)
+    os.replace(tmp, cache)
+
+
+def _group_may_match(stat, op, value) -> bool:
+    if stat is None:
+        return op == "!="
+    lo, hi = stat
+    if op == "==":
+        return lo <= value <= hi
+    if op == "in":
+        return any(lo <= v <= hi for v in value)
+    if op == "!=":
+        return not (lo == hi == value)
+    return FILTER_OPS[op](lo if op in ("<", "<=") else hi, value)
+
+
+def _stat_value(entry, value):
+    """
+    a filter value on the scale the group statistics use
+    """
+    if entry["kind"] in ("category", "text"):
+        index = {category: code for code, category in enumerate(entry["categories"])}
+        if isinstance(value, (list, tuple, set)):
+            return [index.get(str(v), -1) for v in value]
+        return index.get(str(value), -1)
+    if entry["kind"] == "datetime":
+        convert = lambda v: float(pd.Timestamp(v).as_unit("ns").value)
+        return [convert(v) for v in value] if isinstance(value, (list, tuple, set)) else convert(value)
+    return list(value) if isinstance(value, (list, tuple, set)) else value
+
+
+def _read_npcache(cache, meta, columns, filters) -> pd.DataFrame:
+    offsets = meta["offsets"]
+    groups = np.ones(len(offsets) - 1, dtype=bool)
+    for name, op, value in filters or ():
+        entry = meta["columns"][name]
+        if entry["kind"] in ("category", "text") and op not in ("==", "!=", "in"):
+            raise ValueError(f"filter {op!r} is not supported on text column {name!r}")
+        if entry["kind"] == "object":
+            continue
+        scaled = _stat_value(entry, value)
+        groups &= [_group_may_match(stat, op, scaled) for stat in meta["stats"][name]]
+    ranges = [(offsets[i], offsets[i + 1]) for i in np.flatnonzero(groups)]
+
+    wanted = list(columns) if columns is not None else list(meta["columns"])
+    needed = wanted + [name for name, _, _ in filters or () if name not in wanted]
+    data = {}
+    for name in needed:
+        entry = meta["columns"][name]
+        if entry["kind"] == "object":
+            values = np.load(os.path.join(cache, entry["file"]), allow_pickle=True)
+        else:
+            values = np.load(os.path.join(cache, entry["file"]), mmap_mode="r")
+        values = np.concatenate([values[start:end] for start, end in ranges]) if ranges else values[:0].copy()
+        if entry["kind"] == "category":
+            values = pd.Categorical.from_codes(values, entry["categories"])
+        elif entry["kind"] == "text":
+            categories = np.array(entry["categories"] + [np.nan], dtype=object)
+            values = categories[values]
+        data[name] = values
+    df = pd.DataFrame(data, columns=needed)
+    if filters:
+        mask = np.ones(len(df), dtype=bool)
+        for name, op, value in filters:
+            column = df[name]
+            if pd.api.types.is_datetime64_any_dtype(column.dtype):
+                value = [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value)
+            if op == "in":
+                mask &= column.isin(value).to_numpy()
+            else:
+                mask &= FILTER_OPS[op](column, value).to_numpy()
+        df = df.loc[mask, wanted].reset_index(drop=True)
+    return df
+
+
+def read_csv_cached(path, columns: Optional[Sequence[str]] = None, filters=None, parse_dates=None,
+                    compact=False, categorical: Optional[Iterable[str]] = None, sort_by=None,
+                    row_group_size=ROW_GROUP_SIZE, cache_dir=None, engine=None,
+                    report: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    pd.read_csv(path) served from a typed columnar cache
+    the cache is built on first use and rebuilt when the csv's size or mtime
+    changes. columns limits what is read; filters is a list of
+    (column, op, value) with op one of == != < <= > >= in, and row groups
+    whose min/max rule a filter out are never read, which works best when the
+    cache is built with sort_by on the filtered columns. compact stores the
+    frame as load_compact_csv does; report is filled with its memory report.
+    engine is 'parquet' (needs pyarrow, the default when installed) or 'npy'
+    """
+    engine = engine or ("parquet" if parquet_available() else "npy")
+    options = {"parse_dates": parse_dates, "compact": compact,
+               "categorical": list(categorical) if categorical is not None else None,
+               "sort_by": sort_by, "row_group_size": row_group_size}
+    cache = cache_path(path, options, cache_dir, engine)
+    source = _source_signature(path)
+    meta = _read_meta(cache)
+
+    if meta is None or meta.get("source") != source:
+        count("csv_cache.miss")
+        with stage("csv_cache.build") as s:
+            if compact:
+                df, memory = load_compact_csv(path, categorical, parse_dates)
+            else:
+                df = pd.read_csv(path, parse_dates=parse_dates)
+                memory = memory_report(frame_bytes(df), df)
+            if sort_by:
+                df = df.sort_values(sort_by, kind="stable", ignore_index=True)
+            s.rows = len(df)
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            meta = {"source": source, "path": os.path.abspath(path), "rows": len(df),
+                    "memory": {key: memory[key] for key in ("before_bytes", "float32_columns")}}
+            if engine == "parquet":
+                tmp = cache + ".tmp"
+                df.to_parquet(tmp, engine="pyarrow", index=False, row_group_size=row_group_size)
+                os.replace(tmp, cache)
+                _write_json(cache + ".json", meta)
+            else:
+                _write_npcache(df, cache, meta, row_group_size)
+        del df
+    else:
+        count("csv_cache.hit")
+
+    with stage("csv_cache.read") as s:
+        if filters and parse_dates:
+            filters = [(name, op, [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value))
+                       if name in parse_dates else (name, op, value) for name, op, value in filters]
+        if engine == "parquet":
+            df = pd.read_parquet(cache, engine="pyarrow", columns=columns, filters=filters or None)
+        else:
+            df = _read_npcache(cache, meta, columns, filters)
+        s.rows = len(df)
+    if report is not None:
+        # the plain read_csv size, prorated to the rows read
+        before = meta["memory"]["before_bytes"] * len(df) // max(meta["rows"], 1)
+        report.update(memory_report(before, df, meta["memory"]["float32_columns"]))
+    return df
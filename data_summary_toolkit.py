@@ -1,13 +1,26 @@
-import pandas as pd
-df= pd.read_csv ("data.csv")
-print("dataset shape", df.shape)
-print("\n dataset columns", df.columns.tolist())
-print(df.info())
-print("\n descriptive statistics;\n") 
-print(df.describe())
-print("/n unique values in each column:\n")
-print(df.nunique())
-print("\n null values in each column:\n")
-print(df.isnull().sum())
-print("\n duplicate rows in the dataset:\n")
-print(df.duplicated().sum())
+import sys
+
+from data_loader import read_csv_cached
+
+
+def summarize(df):
+    print("dataset shape", df.shape)
+    print("\n dataset columns", df.columns.tolist())
+    print(df.info())
+    print("\n descriptive statistics;\n")
+    print(df.describe())
+    print("/n unique values in each column:\n")
+    print(df.nunique())
+    print("\n null values in each column:\n")
+    print(df.isnull().sum())
+    print("\n duplicate rows in the dataset:\n")
+    print(df.duplicated().sum())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    summarize(read_csv_cached(argv[0] if argv else "data.csv"))
+
+
+if __name__ == "__main__":
+    main()
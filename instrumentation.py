@@ -0,0 +1,229 @@
+"""
+per-stage timing and memory for the scripts
+
+    with stage("csv_load") as s:
+        df = pd.read_csv(path)
+        s.rows = len(df)
+
+    @timed("clean", count="arg")
+    def clean_titles(df): ...
+
+each stage accumulates calls, wall time, cpu time, rows and the process peak
+rss seen at its end; counters are plain named totals. nothing is written
+unless asked for, either from code (metrics.write_json / write_prometheus)
+or from the environment, so production runs can be measured without
+editing the scripts:
+
+    TOOLKIT_METRICS=run.json|run.prom   export when the process exits
+    TOOLKIT_PROFILE=cprofile            profile the whole run to TOOLKIT_PROFILE_OUT
+    TOOLKIT_PROFILE=tracemalloc         also record each stage's traced python peak
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    high-water resident set size of this process
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageStats:
+    __slots__ = ("calls", "wall_seconds", "cpu_seconds", "rows", "peak_rss_bytes", "traced_peak_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows = 0
+        self.peak_rss_bytes = 0
+        self.traced_peak_bytes = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class StageRun:
+    """
+    handle yielded by Metrics.stage; set rows once they are known
+    """
+    __slots__ = ("rows",)
+
+    def __init__(self, rows=0):
+        self.rows = rows
+
+
+class Metrics:
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.trace_memory = False
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        run = StageRun(rows)
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield run
+        finally:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.calls += 1
+            stats.wall_seconds += time.perf_counter() - wall
+            stats.cpu_seconds += time.process_time() - cpu
+            stats.rows += run.rows or 0
+            stats.peak_rss_bytes = max(stats.peak_rss_bytes, peak_rss_bytes() or 0)
+            if self.trace_memory:
+                # nested stages share one tracer, so an outer stage's peak
+                # only covers the part after its last inner stage started
+                import tracemalloc
+                stats.traced_peak_bytes = max(stats.traced_peak_bytes, tracemalloc.get_traced_memory()[1])
+
+    def timed(self, name, count=None):
+        """
+        decorator form of stage; count="result" or "arg" takes rows from
+        len() of the return value or of the first argument
+        """
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name) as run:
+                    if count == "arg":
+                        run.rows = len(args[0])
+                    result = func(*args, **kwargs)
+                    if count == "result":
+                        run.rows = len(result)
+                    return result
+            return wrapper
+        return decorate
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def snapshot(self) -> Dict:
+        return {
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    def prometheus_text(self, prefix="toolkit") -> str:
+        """
+        the stages and counters in the prometheus text exposition format
+        """
+        lines = []
+        series = [
+            ("stage_calls_total", "counter", "calls", "stage calls"),
+            ("stage_wall_seconds_total", "counter", "wall_seconds", "wall time spent in the stage"),
+            ("stage_cpu_seconds_total", "counter", "cpu_seconds", "cpu time spent in the stage"),
+            ("stage_rows_total", "counter", "rows", "rows processed by the stage"),
+            ("stage_peak_rss_bytes", "gauge", "peak_rss_bytes", "process peak rss at the end of the stage"),
+        ]
+        if self.trace_memory:
+            series.append(("stage_traced_peak_bytes", "gauge", "traced_peak_bytes",
+                           "peak python allocations traced during the stage"))
+        for metric, kind, field, help_text in series:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, stats in self.stages.items():
+                lines.append(f'{prefix}_{metric}{{stage="{_label(name)}"}} {getattr(stats, field)}')
+        if self.counters:
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in self.counters.items():
+                lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {value}')
+        lines.append(f"# TYPE {prefix}_process_peak_rss_bytes gauge")
+        lines.append(f"{prefix}_process_peak_rss_bytes {peak_rss_bytes() or 0}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w") as file:
+            file.write(self.prometheus_text())
+
+    def export(self, path):
+        """
+        .prom / .txt get prometheus text, anything else json
+        """
+        if path.endswith((".prom", ".txt")):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        out.write(f"{'stage':<32}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'rows':>12}{'peak MiB':>10}\n")
+        for name, s in sorted(self.stages.items(), key=lambda item: -item[1].wall_seconds):
+            out.write(f"{name:<32}{s.calls:>7}{s.wall_seconds:>10.3f}{s.cpu_seconds:>10.3f}"
+                      f"{s.rows:>12}{s.peak_rss_bytes / 2**20:>10.1f}\n")
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+stage = metrics.stage
+timed = metrics.timed
+count = metrics.count
+
+
+def enable_profiling(mode, out=None):
+    """
+    cprofile profiles the rest of the run and dumps pstats to out at exit;
+    tracemalloc starts tracing and adds traced_peak_bytes to every stage
+    """
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            profiler.disable()
+            profiler.dump_stats(out or "toolkit.pstats")
+        atexit.register(dump)
+    elif mode == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start()
+        metrics.trace_memory = True
+    else:
+        raise ValueError(f"unknown profiling mode {mode!r}, use 'cprofile' or 'tracemalloc'")
+
+
+def export_at_exit(path):
+    atexit.register(metrics.export, path)
+
+
+def configure_from_env(environ=os.environ):
+    if environ.get("TOOLKIT_PROFILE"):
+        enable_profiling(environ["TOOLKIT_PROFILE"], environ.get("TOOLKIT_PROFILE_OUT"))
+    if environ.get("TOOLKIT_METRICS"):
+        export_at_exit(environ["TOOLKIT_METRICS"])
+
+
+configure_from_env()
@@ -1,30 +1,354 @@
-print("🧾 Welcome to Invoice Generator\n")
-
-# Step 1: Take number of items
-num_items = int(input("How many items to bill? "))
-
-# Step 2: Create empty invoice list
-invoice = []
-
-# Step 3: Take item details
-for i in range(num_items):
-    print(f"\nItem {i+1}:")
-    name = input("Item name: ")
-    price = float(input("Item price: "))
-    quantity = int(input("Quantity: "))
-    total = price * quantity
-    invoice.append({"name": name, "price": price, "quantity": quantity, "total": total})
-
-# Step 4: Print invoice summary
-print("\n🔸 Invoice Summary:")
-subtotal = 0
-for item in invoice:
-    print(f"{item['name']} - {item['quantity']} x {item['price']} = {item['total']}")
-    subtotal += item['total']
-
-# Step 5: Add tax and total
-tax = subtotal * 0.05
-grand_total = subtotal + tax
-print(f"\nSubtotal: {subtotal}")
-print(f"Tax (5%): {tax}")
-print(f"Grand Total: {grand_total}")
\ No newline at end of file
+import hashlib
+import os
+import re
+import string
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+TAX_RATE_BP = 500  # 5% in basis points
+
+
+def format_cents(cents) -> str:
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+def read_order_lines(path, chunksize=200_000) -> Iterator:
+    """
+    stream order lines from a csv or jsonl file in DataFrame chunks
+    expected columns: invoice_id, name, price, quantity and optionally tax_rate_bp
+    """
+    import pandas as pd
+
+    if path.endswith((".jsonl", ".ndjson")):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, dtype={"invoice_id": str})
+    else:
+        # the converter keeps names as written, so an item called "NA" or
+        # "null" is not turned into a missing value
+        reader = pd.read_csv(path, chunksize=chunksize, dtype={"invoice_id": str}, converters={"name": str})
+    for chunk in reader:
+        chunk["name"] = chunk["name"].fillna("").astype(str)  # null names in jsonl
+        yield chunk
+
+
+def compute_invoices(lines, tax_rate_bp=TAX_RATE_BP) -> Dict[str, np.ndarray]:
+    """
+    fixed-point totals for a block of order lines grouped by invoice id
+    prices become integer cents, line totals are cents * quantity, subtotals
+    come from one reduceat over the lines sorted by invoice, and tax is
+    rounded half-up from basis points
+    """
+    invoice_ids = lines["invoice_id"].to_numpy(dtype=str)
+    order = np.argsort(invoice_ids, kind="stable")
+    invoice_ids = invoice_ids[order]
+    price_cents = np.rint(lines["price"].to_numpy(dtype=np.float64)[order] * 100).astype(np.int64)
+    quantity = lines["quantity"].to_numpy(dtype=np.int64)[order]
+    line_cents = price_cents * quantity
+
+    starts = np.flatnonzero(np.r_[True, invoice_ids[1:] != invoice_ids[:-1]])
+    subtotal = np.add.reduceat(line_cents, starts) if len(line_cents) else np.empty(0, dtype=np.int64)
+    if "tax_rate_bp" in lines:
+        rate = lines["tax_rate_bp"].to_numpy(dtype=np.int64)[order][starts]
+    else:
+        rate = np.full(len(starts), tax_rate_bp, dtype=np.int64)
+    tax = (subtotal * rate + 5000) // 10000
+    return {
+        "invoice_id": invoice_ids[starts],
+        "offsets": np.r_[starts, len(invoice_ids)],
+        "name": lines["name"].to_numpy(dtype=object)[order],
+        "quantity": quantity,
+        "price_cents": price_cents,
+        "line_cents": line_cents,
+        "subtotal": subtotal,
+        "tax_rate_bp": rate,
+        "tax": tax,
+        "grand_total": subtotal + tax,
+    }
+
+
+def iter_invoice_batches(path, chunksize=200_000, tax_rate_bp=TAX_RATE_BP) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    computed invoice batches from a streamed order file
+    the lines of the last invoice id of each chunk are held back and joined
+    with the next chunk, so an invoice split across a chunk boundary is
+    computed once. lines of one invoice may be scattered within a chunk, but
+    an invoice that reappears after an earlier chunk was emitted raises
+    ValueError instead of being written twice; sort the file by invoice_id
+    """
+    import pandas as pd
+
+    emitted = set()
+
+    def compute(lines):
+        batch = compute_invoices(lines, tax_rate_bp)
+        ids = batch["invoice_id"].tolist()
+        repeated = emitted.intersection(ids)
+        if repeated:
+            raise ValueError(f"invoice {min(repeated)!r} has lines far apart in {path}; "
+                             f"sort the order lines by invoice_id")
+        emitted.update(ids)
+        return batch
+
+    carry = None
+    for chunk in read_order_lines(path, chunksize):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        last_id = chunk["invoice_id"].iloc[-1]
+        held = (chunk["invoice_id"] == last_id).to_numpy()
+        carry = chunk[held]
+        ready = chunk[~held]
+        if len(ready):
+            yield compute(ready)
+    if carry is not None and len(carry):
+        yield compute(carry)
+
+
+def format_cents_array(cents) -> np.ndarray:
+    """
+    vectorized format_cents, as an object array of str
+    """
+    cents = np.asarray(cents, dtype=np.int64)
+    magnitude = np.abs(cents)
+    whole = (magnitude // 100).astype(str).astype(object)
+    frac = np.char.zfill((magnitude % 100).astype(str), 2).astype(object)
+    sign = np.where(cents < 0, "-", "").astype(object)
+    return sign + whole + "." + frac
+
+
+class InvoiceTemplate:
+    def __init__(self,
+                 header="Invoice {invoice_id}\n\n🔸 Invoice Summary:\n",
+                 line="{name} - {quantity} x {price} = {total}",
+                 footer="\nSubtotal: {subtotal}\nTax ({tax_rate}%): {tax}\nGrand Total: {grand_total}\n"):
+        """
+        invoice layout compiled once into literal/field parts
+        header and footer are filled per invoice, line per order line; each part
+        is filled for a whole batch with elementwise string adds on object arrays,
+        and an invoice is then a single join of its pre-built lines. fields are
+        the display strings ("2.50"), so a format spec applies to text:
+        {price:>8} pads, {name!r} quotes
+        """
+        self.header = self._compile(header)
+        self.line = self._compile(line)
+        self.footer = self._compile(footer)
+
+    @staticmethod
+    def _compile(text):
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if conversion not in (None, "r", "s", "a"):
+                raise ValueError(f"unknown conversion !{conversion} in template field {field!r}")
+            parts.append((literal, field, spec, conversion))
+        return parts
+
+    @staticmethod
+    def _fill(parts, columns: Dict[str, np.ndarray], n) -> np.ndarray:
+        formatter = string.Formatter()
+        result = np.full(n, "", dtype=object)
+        for literal, field, spec, conversion in parts:
+            if literal:
+                result = result + literal
+            if field:
+                values = columns[field].astype(str).astype(object)
+                if spec or conversion:
+                    values = np.array([format(formatter.convert_field(value, conversion), spec)
+                                       for value in values.tolist()], dtype=object)
+                result = result + values
+        return result
+
+    def render(self, batch) -> List[str]:
+        """
+        full text of every invoice in a computed batch
+        """
+        n_invoices = len(batch["invoice_id"])
+        rates = batch["tax_rate_bp"]
+        rate_text = {r: f"{r / 100:g}" for r in np.unique(rates).tolist()}
+        invoice_columns = {
+            "invoice_id": batch["invoice_id"].astype(object),
+            "subtotal": format_cents_array(batch["subtotal"]),
+            "tax_rate": np.array([rate_text[r] for r in rates.tolist()], dtype=object),
+            "tax": format_cents_array(batch["tax"]),
+            "grand_total": format_cents_array(batch["grand_total"]),
+        }
+        line_columns = {
+            "name": batch["name"].astype(object),
+            "quantity": batch["quantity"].astype(str).astype(object),
+            "price": format_cents_array(batch["price_cents"]),
+            "total": format_cents_array(batch["line_cents"]),
+        }
+        headers = self._fill(self.header, invoice_columns, n_invoices).tolist()
+        footers = self._fill(self.footer, invoice_columns, n_invoices).tolist()
+        lines = self._fill(self.line, line_columns, len(batch["name"])).tolist()
+        offsets = batch["offsets"].tolist()
+        return [headers[i] + "\n".join(lines[offsets[i]:offsets[i + 1]]) + "\n" + footers[i]
+                for i in range(n_invoices)]
+
+
+DEFAULT_TEMPLATE = InvoiceTemplate()
+
+
+def render_invoice_text(batch, i, template=DEFAULT_TEMPLATE) -> str:
+    return template.render(_slice_batch(batch, i, i + 1))[0]
+
+
+def safe_invoice_id(invoice_id) -> str:
+    """
+    invoice id usable in a file name inside the output directory
+    characters other than letters, digits, '.', '_' and '-' are replaced and
+    a short hash of the original is appended, so "../x" cannot leave the
+    directory and "a/b" does not collide with "a_b"
+    """
+    invoice_id = str(invoice_id)
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", invoice_id)
+    if safe != invoice_id:
+        safe += "-" + hashlib.sha1(invoice_id.encode("utf-8")).hexdigest()[:8]
+    return safe
+
+
+def write_rendered(invoice_ids: Sequence[str], texts: Sequence[str], out_dir, output="files",
+                   buffer_size=1 << 20) -> int:
+    """
+    write rendered invoices; returns bytes written
+    output="files" writes one file per invoice, "concat" writes the batch as
+    one text file (invoices separated by form feeds) in buffer_size blocks,
+    and "archive" stores the batch as one uncompressed zip
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    if output == "files":
+        for invoice_id, text in zip(invoice_ids, texts):
+            data = text.encode("utf-8")
+            with open(os.path.join(out_dir, f"invoice_{safe_invoice_id(invoice_id)}.txt"), "wb") as f:
+                f.write(data)
+            written += len(data)
+        return written
+    batch_name = f"invoices_{safe_invoice_id(invoice_ids[0])}_{safe_invoice_id(invoice_ids[-1])}"
+    if output == "concat":
+        with open(os.path.join(out_dir, batch_name + ".txt"), "wb", buffering=0) as f:
+            block, size = [], 0
+            for text in texts:
+                data = text.encode("utf-8") + b"\f\n"
+                block.append(data)
+                size += len(data)
+                if size >= buffer_size:
+                    written += f.write(b"".join(block))
+                    block, size = [], 0
+            written += f.write(b"".join(block))
+        return written
+    if output == "archive":
+        path = os.path.join(out_dir, batch_name + ".zip")
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for invoice_id, text in zip(invoice_ids, texts):
+                data = text.encode("utf-8")
+                archive.writestr(f"invoice_{safe_invoice_id(invoice_id)}.txt", data)
+                written += len(data)
+        return written
+    raise ValueError(f"unknown output {output!r}, use 'files', 'concat' or 'archive'")
+
+
+def write_invoice_batch(batch, out_dir, output="files", template=DEFAULT_TEMPLATE) -> Dict[str, float]:
+    """
+    render and write one batch, timing the two stages separately
+    """
+    started = time.perf_counter()
+    texts = template.render(batch)
+    rendered = time.perf_counter()
+    written = write_rendered(batch["invoice_id"].tolist(), texts, out_dir, output) if texts else 0
+    finished = time.perf_counter()
+    return {"invoices": len(texts), "bytes": written,
+            "render_seconds": rendered - started, "io_seconds": finished - rendered}
+
+
+def _slice_batch(batch, first, last) -> Dict[str, np.ndarray]:
+    """
+    invoices first..last-1 of a computed batch, with their lines
+    """
+    lo, hi = batch["offsets"][first], batch["offsets"][last]
+    part = {key: batch[key][lo:hi] for key in ("name", "quantity", "price_cents", "line_cents")}
+    part.update({key: batch[key][first:last]
+                 for key in ("invoice_id", "subtotal", "tax_rate_bp", "tax", "grand_total")})
+    part["offsets"] = batch["offsets"][first:last + 1] - lo
+    return part
+
+
+def _split_batch(batch, size) -> List[Dict[str, np.ndarray]]:
+    n = len(batch["invoice_id"])
+    return [_slice_batch(batch, first, min(first + size, n)) for first in range(0, n, size)]
+
+
+def run_billing(path, out_dir="invoices", workers=None, chunksize=200_000,
+                invoices_per_task=2_000, tax_rate_bp=TAX_RATE_BP, output="files",
+                template=DEFAULT_TEMPLATE) -> Dict[str, float]:
+    """
+    stream an order file, compute every invoice and render them in parallel
+    worker processes; returns counts, totals and where the time went
+    (compute in this process, render and io summed over the workers)
+    """
+    stats = {"invoices": 0, "lines": 0, "grand_total_cents": 0, "bytes": 0,
+             "compute_seconds": 0.0, "render_seconds": 0.0, "io_seconds": 0.0}
+
+    def collect(future):
+        for key, value in future.result().items():
+            stats[key] += value
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        batches = iter_invoice_batches(path, chunksize, tax_rate_bp)
+        while True:
+            started = time.perf_counter()
+            batch = next(batches, None)
+            stats["compute_seconds"] += time.perf_counter() - started
+            if batch is None:
+                break
+            stats["lines"] += len(batch["line_cents"])
+            stats["grand_total_cents"] += int(batch["grand_total"].sum())
+            for part in _split_batch(batch, invoices_per_task):
+                pending.append(pool.submit(write_invoice_batch, part, out_dir, output, template))
+                if len(pending) >= 64:  # bound the rendered-but-unwritten backlog
+                    collect(pending.pop(0))
+        for future in pending:
+            collect(future)
+    return stats
+
+
+def main():
+    print("🧾 Welcome to Invoice Generator\n")
+
+    # Step 1: Take number of items
+    num_items = int(input("How many items to bill? "))
+
+    # Step 2: Create empty invoice list
+    invoice = []
+
+    # Step 3: Take item details
+    for i in range(num_items):
+        print(f"\nItem {i+1}:")
+        name = input("Item name: ")
+        price = float(input("Item price: "))
+        quantity = int(input("Quantity: "))
+        total = price * quantity
+        invoice.append({"name": name, "price": price, "quantity": quantity, "total": total})
+
+    # Step 4: Print invoice summary
+    print("\n🔸 Invoice Summary:")
+    subtotal = 0
+    for item in invoice:
+        print(f"{item['name']} - {item['quantity']} x {item['price']} = {item['total']}")
+        subtotal += item['total']
+
+    # Step 5: Add tax and total
+    tax = subtotal * 0.05
+    grand_total = subtotal + tax
+    print(f"\nSubtotal: {subtotal}")
+    print(f"Tax (5%): {tax}")
+    print(f"Grand Total: {grand_total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+level-of-detail downsampling for line charts
+
+a line drawn with more points than the axes has pixel columns only costs
+render time and file size, so long series are reduced before plotting:
+
+    minmax_indices  keeps the first, last, min and max point of every pixel
+                    column; the drawn envelope is identical to the full series
+    lttb_indices    largest-triangle-three-buckets; a fixed number of points
+                    that keeps the visual shape, for smooth or very long series
+
+both take sorted x (numbers or datetime64) and return indices into it.
+plot_lod picks the budget from the axes width and the output dpi
+"""
+from typing import Optional
+
+import numpy as np
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_indices(x, y, buckets) -> np.ndarray:
+    """
+    indices of the first, last, min and max point of each of `buckets`
+    equal-width x intervals, in x order; nan y values are dropped
+    """
+    xf, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    keep = np.flatnonzero(~np.isnan(y))
+    if len(keep) <= 4 * buckets:
+        return keep
+    xf, yk = xf[keep], y[keep]
+    span = xf[-1] - xf[0]
+    bucket = np.minimum(((xf - xf[0]) / (span or 1) * buckets).astype(np.int64), buckets - 1)
+    # within each bucket, order by y: the first row is the min, the last the max
+    order = np.lexsort((yk, bucket))
+    first_of = np.r_[True, bucket[order][1:] != bucket[order][:-1]]
+    last_of = np.r_[first_of[1:], True]
+    edges = np.r_[True, bucket[1:] != bucket[:-1]]
+    picked = np.concatenate([order[first_of], order[last_of],
+                             np.flatnonzero(edges), np.flatnonzero(np.r_[edges[1:], True])])
+    return keep[np.unique(picked)]
+
+
+def lttb_indices(x, y, n_out) -> np.ndarray:
+    """
+    indices of n_out points chosen by largest-triangle-three-buckets
+    """
+    xf, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    keep = np.flatnonzero(~np.isnan(y))
+    n = len(keep)
+    if n_out >= n or n_out < 3:
+        return keep
+    xf, yk = xf[keep], y[keep]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # the average of the next bucket stands in for the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xf[nlo:nhi].mean(), yk[nlo:nhi].mean()
+        area = np.abs((xf[a] - cx) * (yk[lo:hi] - yk[a]) - (xf[a] - xf[lo:hi]) * (cy - yk[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return keep[picked]
+
+
+def pixel_width(ax, dpi: Optional[float] = None) -> int:
+    """
+    width of the axes in output pixels at dpi (default: the figure's dpi)
+    """
+    fig = ax.get_figure()
+    return max(1, int(ax.get_position().width * fig.get_figwidth() * (dpi or fig.dpi)))
+
+
+def plot_lod(ax, x, y, dpi: Optional[float] = None, method="minmax", max_points: Optional[int] = None,
+             **kwargs):
+    """
+    ax.plot(x, y, **kwargs) with y reduced to what the axes can show
+    max_points defaults to four points per pixel column at dpi for minmax and
+    one for lttb. markers are only drawn when the series is shown in full
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if method == "minmax":
+        index = minmax_indices(x, y, max(1, (max_points or 4 * pixel_width(ax, dpi)) // 4))
+    elif method == "lttb":
+        index = lttb_indices(x, y, max_points or pixel_width(ax, dpi))
+    else:
+        raise ValueError(f"unknown method {method!r}, use 'minmax' or 'lttb'")
+    if len(index) < np.count_nonzero(~np.isnan(y)):
+        kwargs.pop("marker", None)
+        kwargs.pop("markersize", None)
+    return ax.plot(x[index], y[index], **kwargs)
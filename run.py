@@ -0,0 +1,98 @@
+"""
+one entry point for every script in the repo
+
+    python run.py                       list the commands
+    python run.py stock-eda prices.csv  run a script's main() with the rest of argv
+    python run.py --metrics run.prom --profile tracemalloc stock-eda prices.csv
+
+--metrics writes the instrumentation stages as json (or prometheus text for
+.prom) when the run ends, --profile turns on cprofile or tracemalloc, and
+--report prints the stage table to stderr
+
+scripts are only imported when their command runs, so nothing heavy is
+loaded just to dispatch; load_script also imports the ones kept under
+.vscode/ folders, whose paths are not importable package names, by putting
+their folder on sys.path
+"""
+import importlib
+import os
+import sys
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SCRIPTS: Dict[str, str] = {
+    "budget": "Budget_tracker.py",
+    "business-ideas": "business_idea_generator.py",
+    "business-visual": ".vscode/bussiness_idea_visualization.py",
+    "calories": "calorie_tracker.py",
+    "clean-data": "data_cleaning_toolkit.py",
+    "contacts": "contact_list.py",
+    "currency": "currency_converter.py",
+    "grades": "student_grade_calculator.py",
+    "invoice": "invoice_genarator.py",
+    "marks": "student_marks_analyzer.py",
+    "netflix": "Netflix_data_cleaning.py",
+    "risk": ".vscode/Ai_powered_financial_risk_analyzer.py",
+    "stock-eda": ".vscoad2/.vscode/stock_market_eda.py",
+    "students": "student_management.py",
+    "summarize-data": "data_summary_toolkit.py",
+}
+
+
+def load_script(command):
+    """
+    import the module behind a command (or a script file name) once
+    """
+    path = SCRIPTS.get(command, command)
+    name = os.path.splitext(os.path.basename(path))[0]
+    # the script's folder goes on sys.path so worker processes started by the
+    # script can import it by name too
+    folder = os.path.normpath(os.path.join(ROOT, os.path.dirname(path)))
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    return importlib.import_module(name)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    metrics_path = profile = None
+    report = False
+    while argv and argv[0].startswith("--"):
+        option = argv.pop(0)
+        if option == "--report":
+            report = True
+        elif option in ("--metrics", "--profile") and argv:
+            if option == "--metrics":
+                metrics_path = argv.pop(0)
+            else:
+                profile = argv.pop(0)
+        else:
+            print(f"unknown option {option!r}")
+            return 2
+    if not argv or argv[0] not in SCRIPTS:
+        if argv:
+            print(f"unknown command {argv[0]!r}")
+        print("usage: python run.py [--metrics FILE] [--profile cprofile|tracemalloc] [--report] "
+              "<command> [args...]\n\ncommands:")
+        for command, path in SCRIPTS.items():
+            print(f"  {command:<16}{path}")
+        return 2
+    if metrics_path or profile or report:
+        import instrumentation
+        if profile:
+            instrumentation.enable_profiling(profile, f"{argv[0]}.pstats")
+    module = load_script(argv[0])
+    sys.argv = [SCRIPTS[argv[0]], *argv[1:]]
+    try:
+        result = module.main()
+    finally:
+        if metrics_path:
+            instrumentation.metrics.export(metrics_path)
+        if report:
+            instrumentation.metrics.report()
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
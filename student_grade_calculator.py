@@ -1,50 +1,154 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (minimum average, grade, gpa) in ascending order; anything below the first band fails
+GRADE_BANDS = [
+    (50, 'B', 2.5),
+    (60, 'A-', 3.0),
+    (70, 'A', 3.5),
+    (80, 'A+', 4.0),
+]
+FAIL_GRADE = ('f', 0.0)
+# numeric DataFrame columns that identify a student rather than hold a mark
+ID_COLUMNS = {'id', 'student_id', 'roll', 'roll_no', 'roll_number'}
+
+
+def _band_arrays(bands=GRADE_BANDS, fail=FAIL_GRADE) -> Tuple[List[float], List[str], List[float]]:
+    bands = sorted(bands)
+    thresholds = [band[0] for band in bands]
+    grades = [fail[0]] + [band[1] for band in bands]
+    gpas = [fail[1]] + [band[2] for band in bands]
+    return thresholds, grades, gpas
+
+
+def grade_for_average(average: float, bands=GRADE_BANDS, fail=FAIL_GRADE) -> Tuple[float, str]:
+    """
+    look up (gpa, grade) for a single average in the band table
+    """
+    thresholds, grades, gpas = _band_arrays(bands, fail)
+    band = bisect_right(thresholds, average)
+    return gpas[band], grades[band]
+
+
 class Student:
     def __init__(self,name):
         self.name=name
         self.subjects={}
     def add_subject(self,subject_name,mark):
-        self.subjects[subject_name] = mark   
+        self.subjects[subject_name] = mark
     def calculate_gpa(self):
-        total_marks=sum(self.subjects.values())  
-        subject_count= len(self.subjects) 
+        total_marks=sum(self.subjects.values())
+        subject_count= len(self.subjects)
         average=total_marks/subject_count
-        
-        if average >=80:
-            grade='A+'
-            gpa=4.0
-        elif average >=70:
-            grade='A'
-            gpa=3.5
-        elif average >=60:
-            grade='A-'
-            gpa=3.0
-        elif average>= 50:
-            grade='B'
-            gpa=2.5
-        else:
-            grade='f'
-            gpa=0.0
-        return gpa,grade   
-    
+        return grade_for_average(average)
+
+
+def grade_cohort(marks, names: Optional[Sequence[str]] = None, bands=GRADE_BANDS,
+                 fail=FAIL_GRADE, subjects: Optional[Sequence[str]] = None):
+    """
+    grade a whole cohort at once
+    marks is a students x subjects array (NaN = subject not taken) or a DataFrame
+    whose subject columns are given by subjects; pass them whenever the frame
+    has other numeric columns (age, year, ...), the default only leaves out the
+    identifier columns in ID_COLUMNS. returns a dict of arrays for array input
+    and a DataFrame with average/gpa/grade columns added for DataFrame input
+
+    >>> import pandas as pd
+    >>> frame = pd.DataFrame({'roll': [1], 'math': [80], 'physics': [90]})
+    >>> grade_cohort(frame)[['average', 'grade']].values.tolist()
+    [[85.0, 'A+']]
+    >>> frame['age'] = 17
+    >>> grade_cohort(frame, subjects=['math', 'physics'])['average'].tolist()
+    [85.0]
+    """
+    frame = None
+    if hasattr(marks, "select_dtypes"):
+        frame = marks
+        if subjects is None:
+            subjects = [column for column in frame.select_dtypes(include="number").columns
+                        if str(column).strip().lower() not in ID_COLUMNS]
+        values = frame[list(subjects)].to_numpy(dtype=np.float64)
+    else:
+        values = np.asarray(marks, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+
+    thresholds, grades, gpas = _band_arrays(bands, fail)
+    taken = (~np.isnan(values)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.nansum(values, axis=1) / taken
+    band = np.searchsorted(np.asarray(thresholds, dtype=np.float64), average, side="right")
+    band[np.isnan(average)] = 0
+    gpa = np.asarray(gpas, dtype=np.float64)[band]
+    grade = np.asarray(grades, dtype=object)[band]
+
+    if frame is not None:
+        result = frame.copy()
+        result['average'] = average
+        result['gpa'] = gpa
+        result['grade'] = grade
+        return result
+    result = {'average': average, 'gpa': gpa, 'grade': grade}
+    if names is not None:
+        result['name'] = np.asarray(names, dtype=object)
+    return result
+
+
+def format_result(name: str, subjects: Dict[str, float], gpa: float, grade: str) -> str:
+    """
+    build the same result text the interactive calculator writes
+    """
+    output=f"Name:{name}"
+    for subject, mark in subjects.items():
+        output += f"{subject}:{mark}"
+    output +=f"GPA:{gpa} Grade:{grade}"
+    return output
+
+
+def write_cohort_results(path: str, names: Sequence[str], subject_names: Sequence[str],
+                         marks, gpa, grade, buffer_size: int = 1 << 20) -> int:
+    """
+    write every student's result as one line of a single file
+    replaces one <name>_result.txt per student; returns the number of lines written
+    """
+    values = np.asarray(marks, dtype=np.float64)
+    written = 0
+    with open(path, "w", buffering=buffer_size) as f:
+        lines = []
+        for i, name in enumerate(names):
+            subjects = {subject: mark for subject, mark in zip(subject_names, values[i].tolist())
+                        if mark == mark}
+            lines.append(format_result(name, subjects, gpa[i], grade[i]) + "\n")
+            if len(lines) >= 10_000:
+                f.writelines(lines)
+                written += len(lines)
+                lines = []
+        f.writelines(lines)
+        written += len(lines)
+    return written
+
+
+def main():
     #input user
     name=input("Enter your name:")
     subject_count=int(input("how many subjects?"))
-    subjects={} 
+    student=Student(name)
     for i in range(subject_count):
-        subject=input(f"Enter name of subjects(i+1):")
+        subject=input(f"Enter name of subjects({i+1}):")
         mark=float(input(f"Enter marks for{subject}:"))
-        subjects[subject]=mark
-    #GPA counting    
-    gpa,grade= calculate_gpa(list(subjects.values())) 
-    
+        student.add_subject(subject, mark)
+    #GPA counting
+    gpa,grade= student.calculate_gpa()
+
     #output
-    output=f"Name:{name}" 
-    for subject, mark in subjects.items():
-        output += f"{subject}:{mark}"
-    output +=f"GPA:{gpa} Grade:{grade}"
+    output=format_result(name, student.subjects, gpa, grade)
     #print
-    print(output)    
+    print(output)
     with open(f"{name}_result.txt","w")as f:
-        f.write(output)     
-                
-    
\ No newline at end of file
+        f.write(output)
+
+
+if __name__ == "__main__":
+    main()
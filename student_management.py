@@ -1,5 +1,15 @@
+import mmap
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
 class Student:
-    def _init_(self, name, roll, grade):
+    __slots__ = ("name", "roll", "grade")
+
+    def __init__(self, name, roll, grade):
         self.name = name
         self.roll = roll
         self.grade = grade
@@ -10,7 +20,7 @@ class Student:
     @staticmethod
     def from_string(data_line):
         name, roll, grade = data_line.strip().split(",")
-        return Student(name, roll, grade)
+        return Student(name, roll, sys.intern(grade))
 
 
 def save_student(student, filename="student_records.txt"):
@@ -29,34 +39,419 @@ def load_students(filename="student_records.txt"):
     return students
 
 
+class StudentStore:
+    def __init__(self, filename="student_records.txt", fsync_every=1000,
+                 compact_ratio=0.5, compact_min_records=10_000):
+        """
+        append-only student log with a roll-number index
+        the log keeps the student_records.txt line format, so existing files open
+        as-is; a newer line for a roll replaces the older one. the index lives in
+        <filename>.idx and only the part of the log it has not seen is scanned
+        """
+        self.filename = filename
+        self.index_filename = filename + ".idx"
+        self.fsync_every = fsync_every
+        self.compact_ratio = compact_ratio
+        self.compact_min_records = compact_min_records
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.order: List[str] = []
+        self.record_count = 0
+        self._pending = 0
+        self._mmap = None
+        self._mapped_size = 0
+        self._file = open(self.filename, "ab")
+        self._load_index()
+
+    # ---- index ----------------------------------------------------------
+
+    def _load_index(self):
+        covered = 0
+        try:
+            with open(self.index_filename, "r", encoding="utf-8") as file:
+                header = file.readline().split()
+                covered, self.record_count = int(header[0]), int(header[1])
+                for line in file:
+                    roll, offset, length = line.rstrip("\n").split("\t")
+                    self.index[roll] = (int(offset), int(length))
+                    self.order.append(roll)
+        except (FileNotFoundError, ValueError, IndexError):
+            covered = 0
+            self.index, self.order, self.record_count = {}, [], 0
+        if covered > os.path.getsize(self.filename):
+            # log was replaced behind our back, rebuild from scratch
+            covered = 0
+            self.index, self.order, self.record_count = {}, [], 0
+        self._scan_log(covered)
+
+    def _scan_log(self, start):
+        with open(self.filename, "rb") as file:
+            file.seek(start)
+            offset = start
+            for raw in file:
+                if not raw.endswith(b"\n"):
+                    break  # torn write at the end of the log
+                if raw.strip():
+                    self._index_line(raw, offset)
+                offset += len(raw)
+
+    def _index_line(self, raw, offset):
+        roll = raw.decode("utf-8").split(",")[1]
+        if roll not in self.index:
+            self.order.append(roll)
+        self.index[roll] = (offset, len(raw))
+        self.record_count += 1
+
+    def save_index(self):
+        """
+        persist the roll index so the next open skips the already indexed log
+        """
+        self.flush()
+        tmp = self.index_filename + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write(f"{os.path.getsize(self.filename)} {self.record_count}\n")
+            file.writelines(f"{roll}\t{self.index[roll][0]}\t{self.index[roll][1]}\n"
+                            for roll in self.order)
+        os.replace(tmp, self.index_filename)
+
+    # ---- writes ---------------------------------------------------------
+
+    def add(self, student: Student):
+        """
+        append one student; fsync happens every fsync_every records
+        """
+        offset = self._file.tell()
+        raw = student.to_string().encode("utf-8")
+        self._file.write(raw)
+        self._index_line(raw, offset)
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.flush()
+        self.maybe_compact()
+
+    def import_students(self, students: Iterable[Student], batch_size=50_000) -> int:
+        """
+        bulk append students in large batches, one fsync per batch
+        """
+        imported = 0
+        batch = []
+        for student in students:
+            batch.append(student.to_string().encode("utf-8"))
+            if len(batch) >= batch_size:
+                imported += self._write_batch(batch)
+                batch = []
+        imported += self._write_batch(batch)
+        self.maybe_compact()
+        return imported
+
+    def _write_batch(self, batch):
+        if not batch:
+            return 0
+        offset = self._file.tell()
+        self._file.write(b"".join(batch))
+        for raw in batch:
+            self._index_line(raw, offset)
+            offset += len(raw)
+        self._pending += len(batch)
+        self.flush()
+        return len(batch)
+
+    def flush(self):
+        """
+        write buffered records and fsync the log
+        """
+        self._file.flush()
+        if self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    # ---- reads ----------------------------------------------------------
+
+    def _view(self):
+        self._file.flush()
+        size = os.path.getsize(self.filename)
+        if size == 0:
+            return b""
+        if self._mmap is None or size != self._mapped_size:
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.filename, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return self._mmap
+
+    def get(self, roll) -> Optional[Student]:
+        """
+        find one student by roll number without scanning the log
+        """
+        entry = self.index.get(str(roll))
+        if entry is None:
+            return None
+        offset, length = entry
+        return Student.from_string(self._view()[offset:offset + length].decode("utf-8"))
+
+    def page(self, page=0, page_size=50) -> List[Student]:
+        """
+        students in insertion order, page_size at a time
+        """
+        view = self._view()
+        students = []
+        for roll in self.order[page * page_size:(page + 1) * page_size]:
+            offset, length = self.index[roll]
+            students.append(Student.from_string(view[offset:offset + length].decode("utf-8")))
+        return students
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, roll):
+        return str(roll) in self.index
+
+    # ---- maintenance ----------------------------------------------------
+
+    def maybe_compact(self):
+        """
+        compact once superseded records make up more than compact_ratio of the log
+        """
+        dead = self.record_count - len(self.order)
+        if self.record_count >= self.compact_min_records and dead > self.record_count * self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """
+        rewrite the log with only the latest record of every roll
+        """
+        self.flush()
+        view = self._view()
+        tmp = self.filename + ".compact"
+        new_index = {}
+        offset = 0
+        with open(tmp, "wb") as file:
+            for roll in self.order:
+                old_offset, length = self.index[roll]
+                file.write(view[old_offset:old_offset + length])
+                new_index[roll] = (offset, length)
+                offset += length
+            file.flush()
+            os.fsync(file.fileno())
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+        os.replace(tmp, self.filename)
+        self._file = open(self.filename, "ab")
+        self.index = new_index
+        self.record_count = len(self.order)
+        self.save_index()
+
+    def close(self):
+        self.save_index()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Roster:
+    def __init__(self, name_blob, name_offsets, rolls, grade_codes, grade_table, rows=None,
+                 roll_keys=None):
+        """
+        columnar roster: names packed into one utf-8 buffer with offsets, rolls as
+        fixed-width bytes exactly as written ("007" stays "007") plus an int64
+        sort key when every roll is numeric, and grades as small integer codes
+        into an interned grade table. filtering and sorting only produce a new
+        row-index array over the same columns
+        """
+        self.name_blob = name_blob
+        self.name_offsets = name_offsets
+        self.rolls = rolls
+        self.roll_keys = roll_keys
+        self.grade_codes = grade_codes
+        self.grade_table = grade_table
+        self.rows = np.arange(len(rolls)) if rows is None else rows
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, str, str]]) -> "Roster":
+        """
+        build a roster from (name, roll, grade) tuples without creating Student objects
+        """
+        names = bytearray()
+        offsets = [0]
+        rolls = []
+        codes = []
+        grade_table: List[str] = []
+        grade_code: Dict[str, int] = {}
+        for name, roll, grade in records:
+            names += name.encode("utf-8")
+            offsets.append(len(names))
+            rolls.append(roll)
+            code = grade_code.get(grade)
+            if code is None:
+                code = grade_code[grade] = len(grade_table)
+                grade_table.append(sys.intern(grade))
+            codes.append(code)
+        code_dtype = np.uint8 if len(grade_table) <= 256 else np.uint16
+        return cls(np.frombuffer(bytes(names), dtype=np.uint8),
+                   np.asarray(offsets, dtype=np.int64),
+                   np.asarray([roll.encode("utf-8") for roll in rolls], dtype=bytes),
+                   np.asarray(codes, dtype=code_dtype),
+                   grade_table,
+                   roll_keys=_roll_keys(rolls))
+
+    @classmethod
+    def from_students(cls, students: Iterable[Student]) -> "Roster":
+        return cls.from_records((s.name, s.roll, s.grade) for s in students)
+
+    @classmethod
+    def load(cls, filename="student_records.txt") -> "Roster":
+        """
+        bulk load a student_records.txt style file straight into columns
+        """
+        try:
+            with open(filename, "r") as file:
+                return cls.from_records(tuple(line.strip().split(","))
+                                        for line in file if line.strip())
+        except FileNotFoundError:
+            return cls.from_records([])
+
+    # ---- row view -------------------------------------------------------
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _name(self, row) -> str:
+        start, end = self.name_offsets[row], self.name_offsets[row + 1]
+        return self.name_blob[start:end].tobytes().decode("utf-8")
+
+    def _roll(self, row) -> str:
+        return self.rolls[row].decode("utf-8")
+
+    def __getitem__(self, i) -> Student:
+        row = self.rows[i]
+        return Student(self._name(row), self._roll(row), self.grade_table[self.grade_codes[row]])
+
+    def __iter__(self) -> Iterator[Student]:
+        for i in range(len(self.rows)):
+            yield self[i]
+
+    def grades(self) -> np.ndarray:
+        return np.asarray(self.grade_table, dtype=object)[self.grade_codes[self.rows]]
+
+    # ---- vectorized queries ---------------------------------------------
+
+    def _take(self, rows) -> "Roster":
+        return Roster(self.name_blob, self.name_offsets, self.rolls,
+                      self.grade_codes, self.grade_table, rows, self.roll_keys)
+
+    def _roll_order_keys(self) -> np.ndarray:
+        keys = self.rolls if self.roll_keys is None else self.roll_keys
+        return keys[self.rows]
+
+    def filter_grade(self, grades: Sequence[str]) -> "Roster":
+        """
+        students whose grade is one of grades (a single grade may be passed as a str)
+        """
+        wanted_grades = {grades} if isinstance(grades, str) else set(grades)
+        wanted = [code for code, grade in enumerate(self.grade_table) if grade in wanted_grades]
+        mask = np.isin(self.grade_codes[self.rows], wanted)
+        return self._take(self.rows[mask])
+
+    def filter_roll_range(self, low, high) -> "Roster":
+        """
+        students with low <= roll <= high
+        """
+        rolls = self._roll_order_keys()
+        if self.roll_keys is None:
+            low, high = str(low).encode("utf-8"), str(high).encode("utf-8")
+        else:
+            low, high = int(low), int(high)
+        return self._take(self.rows[(rolls >= low) & (rolls <= high)])
+
+    def sort_by(self, key="roll", descending=False) -> "Roster":
+        """
+        roster ordered by "roll" or "grade" (grade ties keep roll order)
+        """
+        rolls = self._roll_order_keys()
+        if key == "roll":
+            order = np.argsort(rolls, kind="stable")
+        elif key == "grade":
+            grade_rank = np.argsort(np.argsort(np.asarray(self.grade_table, dtype=object)))
+            order = np.lexsort((rolls, grade_rank[self.grade_codes[self.rows]]))
+        else:
+            raise ValueError(f"cannot sort by {key!r}, use 'roll' or 'grade'")
+        if descending:
+            order = order[::-1]
+        return self._take(self.rows[order])
+
+    def grade_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.grade_codes[self.rows], minlength=len(self.grade_table))
+        return {grade: int(count) for grade, count in zip(self.grade_table, counts) if count}
+
+    def nbytes(self) -> int:
+        keys = 0 if self.roll_keys is None else self.roll_keys.nbytes
+        return (self.name_blob.nbytes + self.name_offsets.nbytes + self.rolls.nbytes + keys
+                + self.grade_codes.nbytes + self.rows.nbytes)
+
+
+def _roll_keys(rolls: List[str]) -> Optional[np.ndarray]:
+    """
+    numeric sort key for the rolls, or None when some roll is not a number
+    """
+    try:
+        return np.asarray([int(roll) for roll in rolls], dtype=np.int64)
+    except ValueError:
+        return None
+
+
 def main():
-    while True:
-        print("\n1. Add Student")
-        print("2. View All Students")
-        print("3. Exit")
-
-        choice = input("Enter choice: ")
-
-        if choice == "1":
-            name = input("Enter name: ")
-            roll = input("Enter roll: ")
-            grade = input("Enter grade: ")
-            student = Student(name, roll, grade)
-            save_student(student)
-            print("Student saved!")
-        elif choice == "2":
-            students = load_students()
-            if not students:
-                print("No students found.")
-            else:
-                for s in students:
+    store = StudentStore()
+    try:
+        while True:
+            print("\n1. Add Student")
+            print("2. View All Students")
+            print("3. Find Student by Roll")
+            print("4. Exit")
+
+            choice = input("Enter choice: ")
+
+            if choice == "1":
+                name = input("Enter name: ")
+                roll = input("Enter roll: ")
+                grade = input("Enter grade: ")
+                student = Student(name, roll, grade)
+                store.add(student)
+                store.flush()
+                print("Student saved!")
+            elif choice == "2":
+                if not len(store):
+                    print("No students found.")
+                    continue
+                page = 0
+                while True:
+                    for s in store.page(page):
+                        print(f"Name: {s.name}, Roll: {s.roll}, Grade: {s.grade}")
+                    page += 1
+                    if page * 50 >= len(store) or input("More? (y/n): ").lower() != "y":
+                        break
+            elif choice == "3":
+                s = store.get(input("Enter roll: "))
+                if s is None:
+                    print("Student not found.")
+                else:
                     print(f"Name: {s.name}, Roll: {s.roll}, Grade: {s.grade}")
-        elif choice == "3":
-            print("Exiting...")
-            break
-        else:
-            print("Invalid choice. Try again.")
+            elif choice == "4":
+                print("Exiting...")
+                break
+            else:
+                print("Invalid choice. Try again.")
+    finally:
+        store.close()
 
 
-if __name__ == "_main_":
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
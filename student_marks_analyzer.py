@@ -1,18 +1,247 @@
+import os
+from typing import Dict, Iterator, Optional
+
 import numpy as np
-marks=np.array([
-    [80,75,98],
-    [65,90,72],
-    [88,92,85],
-    [70,80,75]
+
+marks = np.array([
+    [80, 75, 98],
+    [65, 90, 72],
+    [88, 92, 85],
+    [70, 80, 75]
     ])
-total_per_student = np.sum(marks, axis=1)
-print("Total marks per student:", total_per_student)
 
-avarage_per_subject = np.mean(marks, axis=0)
-print("Average marks per subject:", avarage_per_subject)
+# files bigger than this are memory-mapped instead of read into RAM
+MMAP_THRESHOLD_BYTES = 64 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def load_marks(path: str, delimiter: str = ",", skip_header: Optional[int] = None,
+               mmap_threshold: int = MMAP_THRESHOLD_BYTES) -> np.ndarray:
+    """
+    load a students x subjects marks matrix from a .npy or csv file
+    large .npy files are memory-mapped read-only, csv files are parsed once;
+    use csv_to_npy to convert a big csv so later runs can be memory-mapped
+    """
+    if path.endswith(".npy"):
+        mmap_mode = "r" if os.path.getsize(path) >= mmap_threshold else None
+        data = np.load(path, mmap_mode=mmap_mode)
+    else:
+        if skip_header is None:
+            skip_header = _csv_has_header(path, delimiter)
+        data = np.loadtxt(path, delimiter=delimiter, skiprows=skip_header,
+                          dtype=np.float32, ndmin=2)
+    if data.ndim != 2:
+        raise ValueError(f"expected a 2-d marks matrix, got shape {data.shape}")
+    return data
+
+
+def csv_to_npy(csv_path: str, npy_path: str, delimiter: str = ",",
+               chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """
+    convert a marks csv to a .npy file without holding the whole csv in memory
+    returns the memory-mapped result
+    """
+    skip_header = _csv_has_header(csv_path, delimiter)
+    with open(csv_path, "r") as file:
+        for _ in range(skip_header):
+            file.readline()
+        first = file.readline()
+        n_subjects = len(first.split(delimiter))
+        n_students = 1 + sum(1 for line in file if line.strip())
+
+    out = np.lib.format.open_memmap(npy_path, mode="w+", dtype=np.float32,
+                                    shape=(n_students, n_subjects))
+    with open(csv_path, "r") as file:
+        for _ in range(skip_header):
+            file.readline()
+        row = 0
+        while row < n_students:
+            lines = [file.readline() for _ in range(min(chunk_rows, n_students - row))]
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                break
+            block = np.loadtxt(lines, delimiter=delimiter, dtype=np.float32, ndmin=2)
+            out[row:row + len(block)] = block
+            row += len(block)
+    out.flush()
+    return np.load(npy_path, mmap_mode="r")
+
+
+def _csv_has_header(path: str, delimiter: str) -> int:
+    with open(path, "r") as file:
+        first = file.readline().split(delimiter)
+    try:
+        [float(cell) for cell in first]
+        return 0
+    except ValueError:
+        return 1
+
+
+class GradeAnalytics:
+    def __init__(self, marks: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        """
+        analytics over a students x subjects marks matrix
+        the matrix may be a memory-map; every pass reads it in row chunks
+        so the working set stays at chunk_rows rows at a time
+        """
+        self.marks = marks
+        self.chunk_rows = chunk_rows
+        self.n_students, self.n_subjects = marks.shape
+        self._totals = None
+
+    def iter_chunks(self) -> Iterator[np.ndarray]:
+        """
+        yield consecutive row blocks of the marks matrix
+        """
+        for start in range(0, self.n_students, self.chunk_rows):
+            yield np.asarray(self.marks[start:start + self.chunk_rows], dtype=np.float64)
+
+    def totals(self) -> np.ndarray:
+        """
+        total marks per student
+        """
+        if self._totals is None:
+            totals = np.empty(self.n_students, dtype=np.float64)
+            start = 0
+            for chunk in self.iter_chunks():
+                totals[start:start + len(chunk)] = chunk.sum(axis=1)
+                start += len(chunk)
+            self._totals = totals
+        return self._totals
+
+    def student_stats(self) -> Dict[str, np.ndarray]:
+        """
+        per-student total, average, best and worst mark
+        """
+        totals = self.totals()
+        best = np.empty(self.n_students)
+        worst = np.empty(self.n_students)
+        start = 0
+        for chunk in self.iter_chunks():
+            best[start:start + len(chunk)] = chunk.max(axis=1)
+            worst[start:start + len(chunk)] = chunk.min(axis=1)
+            start += len(chunk)
+        return {
+            'total': totals,
+            'average': totals / self.n_subjects,
+            'max': best,
+            'min': worst,
+        }
+
+    def subject_stats(self) -> Dict[str, np.ndarray]:
+        """
+        per-subject mean, std, min and max accumulated chunk by chunk
+        """
+        count = 0
+        total = np.zeros(self.n_subjects)
+        total_sq = np.zeros(self.n_subjects)
+        low = np.full(self.n_subjects, np.inf)
+        high = np.full(self.n_subjects, -np.inf)
+        for chunk in self.iter_chunks():
+            count += len(chunk)
+            total += chunk.sum(axis=0)
+            total_sq += np.square(chunk).sum(axis=0)
+            np.minimum(low, chunk.min(axis=0), out=low)
+            np.maximum(high, chunk.max(axis=0), out=high)
+        mean = total / count
+        variance = np.maximum(total_sq / count - np.square(mean), 0.0)
+        return {'mean': mean, 'std': np.sqrt(variance), 'min': low, 'max': high}
+
+    def subject_percentiles(self, q=(25, 50, 75, 90)) -> np.ndarray:
+        """
+        percentiles of each subject, shape (len(q), n_subjects)
+        reads one subject column at a time
+        """
+        result = np.empty((len(q), self.n_subjects))
+        for subject in range(self.n_subjects):
+            column = np.asarray(self.marks[:, subject], dtype=np.float64)
+            result[:, subject] = np.percentile(column, q)
+        return result
+
+    def ranks(self) -> np.ndarray:
+        """
+        competition rank of every student by total (1 = topper, ties share a rank)
+        """
+        totals = self.totals()
+        order = np.argsort(-totals, kind="stable")
+        sorted_totals = totals[order]
+        first_of_run = np.r_[True, sorted_totals[1:] != sorted_totals[:-1]]
+        run_rank = np.maximum.accumulate(np.where(first_of_run, np.arange(self.n_students), 0)) + 1
+        ranks = np.empty(self.n_students, dtype=np.int64)
+        ranks[order] = run_rank
+        return ranks
+
+    def percentile_ranks(self) -> np.ndarray:
+        """
+        percentage of students each student scored strictly higher than
+        """
+        totals = self.totals()
+        sorted_totals = np.sort(totals)
+        below = np.searchsorted(sorted_totals, totals, side="left")
+        return below * 100.0 / self.n_students
+
+    def top_n(self, n: int = 10, subject: Optional[int] = None) -> np.ndarray:
+        """
+        indices of the n best students by total, or by one subject, best first
+        uses argpartition per chunk so nothing is fully sorted
+        """
+        n = min(n, self.n_students)
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        best_idx = np.empty(0, dtype=np.int64)
+        best_val = np.empty(0)
+        start = 0
+        for chunk in self.iter_chunks():
+            values = chunk.sum(axis=1) if subject is None else chunk[:, subject]
+            cand_idx = np.concatenate([best_idx, np.arange(start, start + len(chunk))])
+            cand_val = np.concatenate([best_val, values])
+            if len(cand_val) > n:
+                keep = np.argpartition(-cand_val, n - 1)[:n]
+                cand_idx, cand_val = cand_idx[keep], cand_val[keep]
+            best_idx, best_val = cand_idx, cand_val
+            start += len(chunk)
+        order = np.lexsort((best_idx, -best_val))
+        return best_idx[order]
+
+    def bottom_n(self, n: int = 10, subject: Optional[int] = None) -> np.ndarray:
+        """
+        indices of the n weakest students by total, or by one subject, weakest first
+        """
+        n = min(n, self.n_students)
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        values = self.totals() if subject is None else np.asarray(self.marks[:, subject])
+        idx = np.argpartition(values, n - 1)[:n]
+        return idx[np.lexsort((idx, values[idx]))]
+
+    def topper(self) -> int:
+        """
+        index of the student with the highest total
+        """
+        return int(np.argmax(self.totals()))
+
+    def weakest_subject(self) -> int:
+        """
+        index of the subject with the lowest average
+        """
+        return int(np.argmin(self.subject_stats()['mean']))
+
+
+def main():
+    analytics = GradeAnalytics(marks)
+
+    total_per_student = analytics.totals()
+    print("Total marks per student:", total_per_student)
+
+    avarage_per_subject = analytics.subject_stats()['mean']
+    print("Average marks per subject:", avarage_per_subject)
+
+    topper_student = analytics.topper()
+    print(f"Topper: Student {topper_student +1}")
+
+    weakest_subject = analytics.weakest_subject()
+    print(f"Weakest subject: Subject {weakest_subject +1}")
 
-topper_student = np.argmax(total_per_student)
-print(f"Topper: Student {topper_student +1}")
 
-weakest_subject = np.argmin(avarage_per_subject)
-print(f"Weakest subject: Subject {weakest_subject +1}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()